@@ -10,17 +10,47 @@ import platform
 from pathlib import Path
 
 def run_command(cmd, cwd=None):
-    """Run a command and return success status"""
+    """Run a command, streaming its output, and return success status"""
     print(f"Running: {cmd}")
     try:
-        result = subprocess.run(cmd, shell=True, cwd=cwd, check=True, 
-                              capture_output=True, text=True)
-        print(result.stdout)
-        return True
-    except subprocess.CalledProcessError as e:
+        proc = subprocess.Popen(cmd, shell=True, cwd=cwd, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, text=True, bufsize=1)
+    except OSError as e:
         print(f"Error: {e}")
-        print(f"stderr: {e.stderr}")
         return False
+    
+    for line in proc.stdout:
+        sys.stdout.write(line)
+    proc.wait()
+    
+    if proc.returncode != 0:
+        print(f"Error: command exited with status {proc.returncode}")
+        return False
+    return True
+
+def needs_configure(project_root, build_dir):
+    """Check whether CMake has to (re)generate the build tree"""
+    if "--reconfigure" in sys.argv:
+        return True
+    
+    cache = build_dir / "CMakeCache.txt"
+    if not cache.exists():
+        return True
+    
+    # A cache without generated build files means an interrupted configure
+    generated = ["build.ninja", "Makefile"]
+    if not any((build_dir / name).exists() for name in generated) and not any(build_dir.glob("*.sln")):
+        return True
+    
+    # Reconfigure when the project definition is newer than the cache
+    return (project_root / "CMakeLists.txt").stat().st_mtime > cache.stat().st_mtime
+
+def build_jobs():
+    """Number of parallel build jobs, honouring CMAKE_BUILD_PARALLEL_LEVEL"""
+    level = os.environ.get("CMAKE_BUILD_PARALLEL_LEVEL", "")
+    if level.isdigit() and int(level) > 0:
+        return int(level)
+    return os.cpu_count() or 2
 
 def main():
     """Main build function"""
@@ -38,7 +68,7 @@ def main():
         module_ext = ".so"
     
     # Check if the module already exists
-    module_path = project_root / "src" / "python" / "ngpaint" / f"ngp_core_python{module_ext}"
+    module_path = project_root / "src" / "python" / "ngpaint" / f"_ngp_core{module_ext}"
     
     if module_path.exists():
         print(f"Module already exists at {module_path}")
@@ -47,20 +77,24 @@ def main():
             print("Skipping build.")
             return True
     
-    # Configure with CMake
-    print("Configuring with CMake...")
-    if not run_command("cmake ..", cwd=build_dir):
-        print("CMake configuration failed!")
-        return False
+    # Configure with CMake (skipped when the existing build tree is up to date)
+    if needs_configure(project_root, build_dir):
+        print("Configuring with CMake...")
+        if not run_command("cmake ..", cwd=build_dir):
+            print("CMake configuration failed!")
+            return False
+    else:
+        print("CMake cache is up to date, skipping configure (use --reconfigure to force)")
     
     # Build the project
     print("Building project...")
+    jobs = build_jobs()
     if platform.system() == "Windows":
-        if not run_command("cmake --build . --config Release", cwd=build_dir):
+        if not run_command(f"cmake --build . --config Release --parallel {jobs}", cwd=build_dir):
             print("Build failed!")
             return False
     else:
-        if not run_command("make", cwd=build_dir):
+        if not run_command(f"make -j{jobs}", cwd=build_dir):
             print("Build failed!")
             return False
     
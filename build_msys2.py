@@ -7,20 +7,65 @@ import os
 import sys
 import subprocess
 import platform
+import shutil
 from pathlib import Path
 
 def run_command(cmd, cwd=None, env=None):
-    """Run a command and return success status"""
+    """Run a command, streaming its output, and return success status"""
     print(f"Running: {cmd}")
     try:
-        result = subprocess.run(cmd, shell=True, cwd=cwd, check=True, 
-                              capture_output=True, text=True, env=env)
-        print(result.stdout)
-        return True
-    except subprocess.CalledProcessError as e:
+        proc = subprocess.Popen(cmd, shell=True, cwd=cwd, env=env, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, text=True, bufsize=1)
+    except OSError as e:
         print(f"Error: {e}")
-        print(f"stderr: {e.stderr}")
         return False
+    
+    for line in proc.stdout:
+        sys.stdout.write(line)
+    proc.wait()
+    
+    if proc.returncode != 0:
+        print(f"Error: command exited with status {proc.returncode}")
+        return False
+    return True
+
+def cached_launcher(cache):
+    """Normalised compiler launcher path recorded in CMakeCache.txt, or None if unset"""
+    with open(cache, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.startswith("CMAKE_CXX_COMPILER_LAUNCHER:"):
+                value = line.split("=", 1)[1].strip()
+                return os.path.normcase(os.path.normpath(value)) if value else None
+    return None
+
+def needs_configure(project_root, build_dir, launcher=None):
+    """Check whether CMake has to (re)generate the build tree"""
+    if "--reconfigure" in sys.argv:
+        return True
+    
+    cache = build_dir / "CMakeCache.txt"
+    if not cache.exists():
+        return True
+    
+    # A cache without generated build files means an interrupted configure
+    generated = ["build.ninja", "Makefile"]
+    if not any((build_dir / name).exists() for name in generated) and not any(build_dir.glob("*.sln")):
+        return True
+    
+    # The launcher is only applied at configure time, so a new or removed ccache needs one
+    detected = os.path.normcase(os.path.normpath(launcher)) if launcher else None
+    if cached_launcher(cache) != detected:
+        return True
+    
+    # Reconfigure when the project definition is newer than the cache
+    return (project_root / "CMakeLists.txt").stat().st_mtime > cache.stat().st_mtime
+
+def build_jobs():
+    """Number of parallel build jobs, honouring CMAKE_BUILD_PARALLEL_LEVEL"""
+    level = os.environ.get("CMAKE_BUILD_PARALLEL_LEVEL", "")
+    if level.isdigit() and int(level) > 0:
+        return int(level)
+    return os.cpu_count() or 2
 
 def main():
     """Main build function"""
@@ -65,6 +110,14 @@ def main():
         print("   Open MSYS2 terminal and run: pacman -S mingw-w64-x86_64-pybind11")
         print("   Continuing with build anyway...")
     
+    # Check for a compiler cache to speed up rebuilds
+    launcher = shutil.which("ccache", path=env['PATH']) or shutil.which("sccache", path=env['PATH'])
+    if launcher:
+        print(f"Using compiler launcher: {launcher}")
+    else:
+        print("ℹ️  ccache not found. Install it for faster rebuilds:")
+        print("   Open MSYS2 terminal and run: pacman -S mingw-w64-x86_64-ccache")
+    
     # Determine the Python module extension
     if platform.system() == "Windows":
         module_ext = ".pyd"
@@ -72,7 +125,7 @@ def main():
         module_ext = ".so"
     
     # Check if the module already exists
-    module_path = project_root / "src" / "python" / "ngpaint" / f"ngp_core_python{module_ext}"
+    module_path = project_root / "src" / "python" / "ngpaint" / f"_ngp_core{module_ext}"
     
     if module_path.exists():
         print(f"Module already exists at {module_path}")
@@ -81,16 +134,22 @@ def main():
             print("Skipping build.")
             return True
     
-    # Configure with CMake
-    print("\nConfiguring with CMake...")
-    cmake_cmd = f"{mingw64_path}\\bin\\cmake.exe .. -G \"MinGW Makefiles\""
-    if not run_command(cmake_cmd, cwd=build_dir, env=env):
-        print("CMake configuration failed!")
-        return False
+    # Configure with CMake (skipped when the existing build tree is up to date)
+    if needs_configure(project_root, build_dir, launcher):
+        print("\nConfiguring with CMake...")
+        cmake_cmd = f"{mingw64_path}\\bin\\cmake.exe .. -G \"MinGW Makefiles\""
+        if launcher:
+            cmake_cmd += f" -DCMAKE_C_COMPILER_LAUNCHER=\"{launcher}\" -DCMAKE_CXX_COMPILER_LAUNCHER=\"{launcher}\""
+        if not run_command(cmake_cmd, cwd=build_dir, env=env):
+            print("CMake configuration failed!")
+            return False
+    else:
+        print("\nCMake cache is up to date, skipping configure (use --reconfigure to force)")
     
     # Build the project
     print("\nBuilding project...")
-    if not run_command(f"{mingw64_path}\\bin\\mingw32-make.exe", cwd=build_dir, env=env):
+    jobs = build_jobs()
+    if not run_command(f"{mingw64_path}\\bin\\mingw32-make.exe -j{jobs}", cwd=build_dir, env=env):
         print("Build failed!")
         return False
     
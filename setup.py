@@ -29,6 +29,7 @@ setup(
     author="NextGenPaint Team",
     packages=find_packages(where="src"),
     package_dir={"": "src"},
+    package_data={"ngpaint": ["_ngp_core*.pyd", "_ngp_core*.so", "ui/icons/*.svg"]},
     install_requires=install_requires,
     python_requires=">=3.8",
     classifiers=[
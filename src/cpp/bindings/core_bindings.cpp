@@ -1,5 +1,6 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <pybind11/numpy.h>
 #include <pybind11/functional.h>
 #include "../include/tile_engine.h"
 #include "../include/canvas_core.h"
@@ -7,7 +8,7 @@
 
 namespace py = pybind11;
 
-PYBIND11_MODULE(ngp_core_python, m) {
+PYBIND11_MODULE(_ngp_core, m) {
     m.doc() = "Next-Gen Paint Core Python Bindings";
     
     // Pixel class
@@ -45,7 +46,15 @@ PYBIND11_MODULE(ngp_core_python, m) {
         .def("clear", &ngp::TileGrid::clear)
         .def("fill", &ngp::TileGrid::fill)
         .def("get_dirty_tiles", &ngp::TileGrid::getDirtyTiles)
-        .def("clear_dirty_flags", &ngp::TileGrid::clearDirtyFlags);
+        .def("clear_dirty_flags", &ngp::TileGrid::clearDirtyFlags)
+        .def("load_from_numpy", [](ngp::TileGrid& grid, py::array_t<uint8_t, py::array::c_style | py::array::forcecast> arr) {
+            if (arr.ndim() != 3 || arr.shape(2) != 4) {
+                throw std::invalid_argument("load_from_numpy expects an (H, W, 4) uint8 array");
+            }
+            py::gil_scoped_release release;
+            grid.loadRGBA8(arr.data(), static_cast<int>(arr.shape(1)), static_cast<int>(arr.shape(0)),
+                           static_cast<size_t>(arr.strides(0)));
+        });
     
     // BlendMode enum
     py::enum_<ngp::BlendMode>(m, "BlendMode")
@@ -73,7 +82,9 @@ PYBIND11_MODULE(ngp_core_python, m) {
         .def("set_blend_mode", &ngp::Layer::setBlendMode)
         .def("is_visible", &ngp::Layer::isVisible)
         .def("set_visible", &ngp::Layer::setVisible)
-        .def("get_pixels", static_cast<ngp::TileGrid&(ngp::Layer::*)()>(&ngp::Layer::getPixels))
+        // Return the layer's own grid, not a copy, so writes like load_from_numpy reach the layer
+        .def("get_pixels", static_cast<ngp::TileGrid&(ngp::Layer::*)()>(&ngp::Layer::getPixels),
+             py::return_value_policy::reference_internal)
         .def("get_clip_mask", &ngp::Layer::getClipMask)
         .def("set_clip_mask", &ngp::Layer::setClipMask)
         .def("add_adjustment", &ngp::Layer::addAdjustment)
@@ -242,4 +242,32 @@ void TileGrid::fromMat(const cv::Mat& mat) {
     }
 }
 
+void TileGrid::loadRGBA8(const uint8_t* data, int width, int height, size_t rowStride) {
+    const int w = std::min(width, width_);
+    const int h = std::min(height, height_);
+    
+    for (int ty = 0; ty < tileCountY_; ++ty) {
+        const int y0 = ty * Tile::TILE_SIZE;
+        const int rows = std::min(Tile::TILE_SIZE, h - y0);
+        for (int tx = 0; tx < tileCountX_; ++tx) {
+            const int x0 = tx * Tile::TILE_SIZE;
+            const int cols = std::min(Tile::TILE_SIZE, w - x0);
+            if (rows <= 0 || cols <= 0) {
+                continue;
+            }
+            
+            Tile& tile = getTile(tx, ty);
+            for (int ly = 0; ly < rows; ++ly) {
+                // Tile rows are contiguous, so convert a whole row per pass
+                const uint8_t* src = data + (y0 + ly) * rowStride + x0 * 4;
+                Pixel* dst = &tile.at(0, ly);
+                for (int lx = 0; lx < cols; ++lx, src += 4) {
+                    // Widen 8-bit to 16-bit (x * 257 maps 255 to 65535)
+                    dst[lx] = Pixel(src[0] * 257, src[1] * 257, src[2] * 257, src[3] * 257);
+                }
+            }
+        }
+    }
+}
+
 } // namespace ngp 
\ No newline at end of file
@@ -85,6 +85,9 @@ public:
     // OpenCV conversion
     cv::Mat toMat() const;
     void fromMat(const cv::Mat& mat);
+    
+    // Bulk upload of an 8-bit RGBA buffer (row-major, rowStride in bytes)
+    void loadRGBA8(const uint8_t* data, int width, int height, size_t rowStride);
 
 private:
     std::vector<std::unique_ptr<Tile>> tiles_;
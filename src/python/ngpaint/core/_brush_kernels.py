@@ -0,0 +1,167 @@
+"""
+Round-brush rasterisation for the numpy fallback canvas
+"""
+
+import cv2
+import numpy as np
+
+# Numba is optional; splat_polyline falls back to an OpenCV distance transform
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+
+    # Eagerly compiled for the layer buffer types so the first stroke doesn't pay for JIT
+    @njit("void(uint8[:, :, ::1], int32[:, ::1], float32, float32, uint8[::1], float32, boolean)",
+          parallel=True, fastmath=True, cache=True)
+    def _splat_polyline(canvas, points, radius, hardness, color, opacity, erase):
+        """Stamp a round brush along a polyline, blending once per covered pixel"""
+        height, width = canvas.shape[0], canvas.shape[1]
+        n = points.shape[0]
+        
+        # Clip the work to the stroke's bounding box plus the anti-aliasing fringe
+        x_min, y_min = points[0, 0], points[0, 1]
+        x_max, y_max = x_min, y_min
+        for i in range(1, n):
+            x_min = min(x_min, points[i, 0])
+            x_max = max(x_max, points[i, 0])
+            y_min = min(y_min, points[i, 1])
+            y_max = max(y_max, points[i, 1])
+        pad = np.int32(radius) + 2
+        x_lo, x_hi = max(0, x_min - pad), min(width, x_max + pad + 1)
+        y_lo, y_hi = max(0, y_min - pad), min(height, y_max + pad + 1)
+        if x_lo >= x_hi or y_lo >= y_hi:
+            return
+        
+        inner = radius * hardness
+        reach = radius + np.float32(0.5)
+        outer2 = reach * reach
+        core = max(np.float32(0.0), min(inner, radius - np.float32(0.5)))
+        core2 = core * core  # Fully covered inside this, so those pixels skip the falloff
+        src_alpha = opacity if erase else opacity * (color[3] / 255.0)
+        
+        for y in prange(y_lo, y_hi):
+            py = np.float32(y)
+            
+            # Strongest coverage per pixel across all segments, so joints aren't blended twice
+            coverage = np.zeros(x_hi - x_lo, dtype=np.float32)
+            c_lo, c_hi = x_hi, x_lo
+            
+            for i in range(max(1, n - 1)):
+                j = min(i + 1, n - 1)
+                ax, ay = points[i, 0], points[i, 1]
+                bx, by = points[j, 0], points[j, 1]
+                if y < min(ay, by) - pad or y > max(ay, by) + pad:
+                    continue
+                
+                # Columns of this row within reach of the segment: its own bounding box,
+                # narrowed to the band around its line so long diagonals stay cheap
+                s_lo = max(x_lo, min(ax, bx) - pad)
+                s_hi = min(x_hi, max(ax, bx) + pad + 1)
+                dx, dy = np.float32(bx - ax), np.float32(by - ay)
+                length2 = dx * dx + dy * dy
+                inv_length2 = np.float32(1.0) / length2 if length2 > 0.0 else np.float32(0.0)
+                if dy != 0.0:
+                    centre = ax + (py - ay) * dx / dy
+                    half = reach * np.sqrt(length2) / abs(dy) + np.float32(1.0)
+                    s_lo = max(s_lo, np.int32(np.floor(centre - half)))
+                    s_hi = min(s_hi, np.int32(np.ceil(centre + half)) + 1)
+                
+                for x in range(s_lo, s_hi):
+                    # Squared distance to the segment
+                    px = np.float32(x)
+                    t = min(np.float32(1.0), max(np.float32(0.0), ((px - ax) * dx + (py - ay) * dy) * inv_length2))
+                    ex, ey = px - (ax + t * dx), py - (ay + t * dy)
+                    d2 = ex * ex + ey * ey
+                    if d2 >= outer2:
+                        continue
+                    
+                    # One-pixel anti-aliased edge times a smoothstep falloff from hardness to radius
+                    w = np.float32(1.0)
+                    if d2 > core2:
+                        d = np.sqrt(d2)
+                        w = min(np.float32(1.0), reach - d)
+                        if d > inner and radius > inner:
+                            s = min(np.float32(1.0), (radius - d) / (radius - inner))
+                            w *= s * s * (3.0 - 2.0 * s)
+                    k = x - x_lo
+                    if w > coverage[k]:
+                        coverage[k] = w
+                        c_lo = min(c_lo, x)
+                        c_hi = max(c_hi, x + 1)
+            
+            for x in range(c_lo, c_hi):
+                a = coverage[x - x_lo] * src_alpha
+                if a <= 0.0:
+                    continue
+                
+                dst_a = canvas[y, x, 3] / np.float32(255.0)
+                if erase:
+                    canvas[y, x, 3] = np.uint8(dst_a * (1.0 - a) * 255.0 + 0.5)
+                    continue
+                
+                # Non-premultiplied source-over
+                keep = dst_a * (1.0 - a)
+                out_a = a + keep
+                for c in range(3):
+                    canvas[y, x, c] = np.uint8((color[c] * a + canvas[y, x, c] * keep) / out_a + 0.5)
+                canvas[y, x, 3] = np.uint8(out_a * 255.0 + 0.5)
+
+
+def _splat_polyline_cv2(canvas, points, radius, hardness, color, opacity, erase):
+    """OpenCV version of _splat_polyline with the same falloff and blending"""
+    height, width = canvas.shape[:2]
+    pad = int(radius) + 2
+    x0, y0 = np.maximum(points.min(axis=0) - pad, 0)
+    x1, y1 = np.minimum(points.max(axis=0) + pad + 1, (width, height))
+    if x0 >= x1 or y0 >= y1:
+        return
+    
+    # Distance from every pixel in the box to the stroke's centreline
+    line = np.full((y1 - y0, x1 - x0), 255, dtype=np.uint8)
+    cv2.polylines(line, [(points - (x0, y0)).astype(np.int32).reshape(-1, 1, 2)], isClosed=False, color=0, thickness=1)
+    d = cv2.distanceTransform(line, cv2.DIST_L2, cv2.DIST_MASK_PRECISE)
+    
+    # Only pixels within reach of the centreline get a weight
+    covered = d < radius + 0.5
+    d = d[covered]
+    w = np.minimum(radius + 0.5 - d, 1.0)
+    inner = radius * hardness
+    if radius > inner:
+        s = np.clip((radius - d) / (radius - inner), 0.0, 1.0)
+        w = np.where(d > inner, w * s * s * (3.0 - 2.0 * s), w)
+    a = w * (opacity if erase else opacity * (color[3] / 255.0))
+    
+    region = canvas[y0:y1, x0:x1]
+    pixels = region[covered].astype(np.float32)
+    dst_a = pixels[:, 3] / 255.0
+    if erase:
+        region[covered, 3] = (dst_a * (1.0 - a) * 255.0 + 0.5).astype(np.uint8)
+        return
+    
+    # Non-premultiplied source-over
+    keep = dst_a * (1.0 - a)
+    out_a = a + keep
+    pixels[:, :3] = (color[:3] * a[:, None] + pixels[:, :3] * keep[:, None]) / out_a[:, None] + 0.5
+    pixels[:, 3] = out_a * 255.0 + 0.5
+    region[covered] = pixels.astype(np.uint8)
+
+
+def splat_polyline(canvas: np.ndarray, points, radius: float, hardness: float, color, opacity: float,
+                   erase: bool = False):
+    """Paint (or erase) a round brush along points on an (H, W, 4) uint8 RGBA canvas in place"""
+    points = np.ascontiguousarray(points, dtype=np.int32).reshape(-1, 2)
+    rgba = np.full(4, 255, dtype=np.uint8)
+    if color is not None:
+        rgba[:len(color)] = color[:4]
+    hardness = min(max(hardness, 0.0), 1.0)
+    opacity = min(max(opacity, 0.0), 1.0)
+    if NUMBA_AVAILABLE:
+        _splat_polyline(canvas, points, np.float32(radius), np.float32(hardness),
+                        rgba, np.float32(opacity), bool(erase))
+    else:
+        _splat_polyline_cv2(canvas, points, float(radius), hardness, rgba, opacity, erase)
@@ -0,0 +1,110 @@
+"""
+Numba-compiled pixel kernels for the numpy fallback canvas
+"""
+
+from typing import Optional
+
+import numpy as np
+
+# Numba is optional; callers check NUMBA_AVAILABLE and fall back to numpy
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+
+    # Eagerly compiled for any-layout views, so compositing just a stroke's dirty
+    # rect of the layer stack doesn't trigger a JIT compile on the first stroke
+    @njit("void(uint8[:, :, :, :], boolean[::1], int32[::1], uint8[:, :, :])", parallel=True, cache=True)
+    def _composite_stack(layers, visible, opacity_q8, out):
+        """Composite an (N,H,W,4) uint8 stack over out using 8-bit fixed point"""
+        n_layers, height, width = layers.shape[0], layers.shape[1], layers.shape[2]
+        for y in prange(height):
+            for x in range(width):
+                for n in range(1, n_layers):
+                    if not visible[n]:
+                        continue
+                    a = (np.int32(layers[n, y, x, 3]) * opacity_q8[n] + 128) >> 8
+                    a += a >> 7  # map 255 -> 256 so full alpha replaces exactly
+                    if a == 0:
+                        continue
+                    for c in range(3):
+                        base = np.int32(out[y, x, c])
+                        out[y, x, c] = base + (((np.int32(layers[n, y, x, c]) - base) * a) >> 8)
+                    if layers[n, y, x, 3] > out[y, x, 3]:
+                        out[y, x, 3] = layers[n, y, x, 3]
+
+    @njit(parallel=True, cache=True)
+    def _unsharp_threshold(image, blurred, amount, threshold):
+        """Sharpen image in place wherever |image - blurred| exceeds threshold"""
+        height, width, channels = image.shape
+        for y in prange(height):
+            for x in range(width):
+                for c in range(channels):
+                    d = np.int32(image[y, x, c]) - np.int32(blurred[y, x, c])
+                    if abs(d) > threshold:
+                        v = np.int32(image[y, x, c] + d * amount + 0.5)
+                        image[y, x, c] = min(255, max(0, v))
+
+    @njit(parallel=True, cache=True)
+    def _blend_over_checker(image, out, size, color1, color2, x0, y0):
+        """Flatten RGBA image over a checkerboard into RGB out in one pass"""
+        height, width = out.shape[0], out.shape[1]
+        for y in prange(height):
+            row_parity = ((y + y0) // size) & 1
+            for x in range(width):
+                a = np.int32(image[y, x, 3])
+                a += a >> 7  # map 255 -> 256 so opaque pixels copy exactly
+                even = (((x + x0) // size) & 1) == row_parity
+                for c in range(3):
+                    base = np.int32(color1[c]) if even else np.int32(color2[c])
+                    out[y, x, c] = base + (((np.int32(image[y, x, c]) - base) * a) >> 8)
+
+
+def fill_checker(buf: np.ndarray, size: int, color1, color2, x0: int = 0, y0: int = 0):
+    """Fill buf with size-pixel checker cells, color1 where the cell parity is even"""
+    color1 = np.asarray(color1, dtype=np.uint8)
+    color2 = np.asarray(color2, dtype=np.uint8)
+    height, width = buf.shape[:2]
+    rows = (np.arange(y0, y0 + height) // size)[:, None]
+    cols = (np.arange(x0, x0 + width) // size)[None, :]
+    even = ((rows + cols) & 1) == 0
+    buf[...] = np.where(even[..., None], color1, color2)
+
+
+def blend_over_checker(image: np.ndarray, out: np.ndarray, size: int, color1, color2, x0: int = 0, y0: int = 0):
+    """Write image (H, W, 4 RGBA) flattened over checker cells into out (H, W, 3 RGB)"""
+    color1 = np.asarray(color1, dtype=np.uint8)
+    color2 = np.asarray(color2, dtype=np.uint8)
+    if NUMBA_AVAILABLE:
+        _blend_over_checker(image, out, int(size), color1, color2, int(x0), int(y0))
+        return
+    
+    fill_checker(out, size, color1, color2, x0, y0)
+    alpha = image[..., 3:4].astype(np.uint16)
+    alpha += alpha >> 7
+    rgb = out.astype(np.uint16)
+    rgb *= 256 - alpha
+    rgb += image[..., :3] * alpha
+    rgb >>= 8
+    np.copyto(out, rgb, casting='unsafe')
+
+
+def composite_stack(layers: np.ndarray, visible: np.ndarray, opacity: np.ndarray,
+                    out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Composite layers[1:] over layers[0] in a single compiled pass, into out if given"""
+    if out is None:
+        out = layers[0].copy()
+    else:
+        np.copyto(out, layers[0])
+    opacity_q8 = np.rint(np.clip(opacity, 0.0, 1.0) * 256.0).astype(np.int32)
+    _composite_stack(layers, visible.astype(np.bool_), opacity_q8, out)
+    return out
+
+
+def unsharp_threshold(image: np.ndarray, blurred: np.ndarray, amount: float, threshold: int):
+    """Thresholded unsharp mask applied in place on a uint8 image"""
+    _unsharp_threshold(image, blurred, np.float32(amount), np.int32(threshold))
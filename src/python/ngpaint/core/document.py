@@ -7,19 +7,17 @@ import numpy as np
 from pathlib import Path
 from typing import Optional, List, Tuple
 import json
+from collections import deque
 from datetime import datetime
 
+from ._kernels import NUMBA_AVAILABLE
+from ._brush_kernels import splat_polyline
+if NUMBA_AVAILABLE:
+    from ._kernels import composite_stack, unsharp_threshold
+
 # Import C++ bindings
 try:
-    import sys
-    import os
-    # Add the current directory (ngpaint) to Python path to find the module
-    current_dir = os.path.dirname(os.path.abspath(__file__))  # core/
-    parent_dir = os.path.dirname(current_dir)  # ngpaint/
-    if parent_dir not in sys.path:
-        sys.path.insert(0, parent_dir)
-    
-    import ngp_core_python as ngp
+    from .. import _ngp_core as ngp
     print("Successfully imported C++ bindings")
 except ImportError as e:
     # Fallback for development
@@ -33,29 +31,96 @@ except ImportError as e:
     ngp = None
 
 class Layer:
-    """Simple layer implementation for fallback mode"""
-    
-    def __init__(self, name: str, width: int, height: int):
-        self.name = name
-        self.visible = True
-        self.opacity = 1.0
-        self.blend_mode = "normal"
-        self.image = np.zeros((height, width, 4), dtype=np.uint8)
-        self.image[:, :, 3] = 0  # Transparent by default
+    """View onto one slot of the document's contiguous layer stack (fallback mode)
+    
+    Layer images are always C-contiguous (H, W, 4) uint8 RGBA, so hot paths can hand
+    them straight to cv2 and numba without conversion copies.
+    """
+    
+    __slots__ = ('_document', '_index')
+    
+    def __init__(self, document: 'Document', index: int):
+        self._document = document
+        self._index = index
+    
+    @property
+    def name(self) -> str:
+        return self._document._layer_names[self._index]
+    
+    @name.setter
+    def name(self, value: str):
+        self._document._layer_names[self._index] = value
+    
+    @property
+    def visible(self) -> bool:
+        return bool(self._document._visible[self._index])
+    
+    @visible.setter
+    def visible(self, value: bool):
+        self._document._visible[self._index] = value
+        self._document._composite_dirty = True
+    
+    @property
+    def opacity(self) -> float:
+        return float(self._document._opacity[self._index])
+    
+    @opacity.setter
+    def opacity(self, value: float):
+        self._document._opacity[self._index] = value
+        self._document._composite_dirty = True
+    
+    @property
+    def blend_mode(self) -> str:
+        return self._document._blend_modes[self._index]
+    
+    @blend_mode.setter
+    def blend_mode(self, value: str):
+        self._document._blend_modes[self._index] = value
+        self._document._composite_dirty = True
+    
+    @property
+    def image(self) -> np.ndarray:
+        """(H, W, 4) uint8 view into the layer stack"""
+        return self._document._layer_stack[self._index]
+    
+    @image.setter
+    def image(self, value: np.ndarray):
+        # No implicit casting: callers must already hold uint8 RGBA pixels
+        np.copyto(self._document._layer_stack[self._index], value, casting='no')
+        self._document._composite_dirty = True
 
 class Document:
     """Document class for managing canvas and file operations"""
     
+    # Filters the numpy fallback implements; anything else is a no-op without the C++ core
+    _FALLBACK_FILTERS = ("gaussian_blur", "unsharp_mask", "brightness_contrast")
+    
+    # Free undo tile buffers kept for reuse (256 tiles of 256px RGBA = 64 MB)
+    _TILE_POOL_LIMIT = 256
+    
     def __init__(self):
         self.canvas_core = None
         self.file_path = None
         self.width = 1920
         self.height = 1080
         self.active_layer_index = 0
-        self.layers = []
-        self.undo_stack = []
-        self.redo_stack = []
         self.max_undo_steps = 50
+        self.undo_stack = deque(maxlen=self.max_undo_steps)
+        self.redo_stack = deque(maxlen=self.max_undo_steps)
+        self.tile_size = 256  # Undo snapshot granularity, matches performance.tile_size
+        self._tile_pool = []  # Recycled (tile_size, tile_size, 4) snapshot buffers
+        self._next_layer_id = 0
+        
+        # Last composite, reused until a mutating operation marks it dirty
+        self._composite_cache = None
+        self._composite_rgba = None  # Display copy, only needed when the core returns BGRA
+        self._composite_dirty = True
+        self._composite_rect = None  # (x0, y0, x1, y1) repainted since the cache, if only that
+        self.composite_version = 0  # Bumped each time a new composite is produced
+        self.composite_changed_rect = None  # Box the latest composite changed, None if everything
+        
+        # Fallback layers live in one (capacity, H, W, 4) buffer plus per-layer SoA arrays
+        self._allocate_layer_stack(0)
         
         # Initialize canvas core if available
         if ngp:
@@ -66,12 +131,11 @@ class Document:
     
     def new_document(self, width: int, height: int):
         """Create a new document"""
+        self._composite_dirty = True
         self.width = width
         self.height = height
         self.file_path = None
-        self.layers = []
-        self.undo_stack = []
-        self.redo_stack = []
+        self._clear_history()
         
         if self.canvas_core:
             self.canvas_core = ngp.CanvasCore(width, height)
@@ -81,6 +145,11 @@ class Document:
     
     def open_document(self, file_path: str):
         """Open an existing document"""
+        self.load_image(self.read_image_file(file_path), file_path)
+    
+    @staticmethod
+    def read_image_file(file_path: str) -> np.ndarray:
+        """Decode an image file to 8-bit RGBA; touches no document state, so it is thread-safe"""
         file_path = Path(file_path)
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
@@ -90,21 +159,28 @@ class Document:
         if image is None:
             raise ValueError(f"Failed to load image: {file_path}")
         
-        # Convert BGR to RGB
-        if len(image.shape) == 3 and image.shape[2] == 3:
-            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            # Add alpha channel
-            alpha = np.full((image.shape[0], image.shape[1], 1), 255, dtype=np.uint8)
-            image = np.concatenate([image, alpha], axis=2)
+        # Normalise to 8 bits per channel once so layers never need conversion later
+        if image.dtype == np.uint16:
+            image = cv2.convertScaleAbs(image, alpha=1.0 / 257.0)
+        elif image.dtype != np.uint8:
+            image = cv2.normalize(image, None, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U)
+        
+        # Convert BGR to RGBA; OpenCV fills the new alpha channel with 255
+        if len(image.shape) == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGBA)
+        elif len(image.shape) == 3 and image.shape[2] == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGBA)
         elif len(image.shape) == 3 and image.shape[2] == 4:
             image = cv2.cvtColor(image, cv2.COLOR_BGRA2RGBA)
-        
+        return image
+    
+    def load_image(self, image: np.ndarray, file_path: str):
+        """Replace the document with a decoded RGBA image read from file_path"""
+        self._composite_dirty = True
         self.width = image.shape[1]
         self.height = image.shape[0]
-        self.file_path = str(file_path)
-        self.layers = []
-        self.undo_stack = []
-        self.redo_stack = []
+        self.file_path = str(Path(file_path))
+        self._clear_history()
         
         if self.canvas_core:
             # Create new canvas core with image dimensions
@@ -126,13 +202,17 @@ class Document:
     
     def save_document_as(self, file_path: str):
         """Save the document to a specific path"""
-        file_path = Path(file_path)
-        
         # Get the composited image
         image = self.get_composited_image()
         if image is None:
             raise ValueError("No image data to save")
         
+        self.write_image_file(file_path, image)
+        self.file_path = str(Path(file_path))
+    
+    @staticmethod
+    def write_image_file(file_path: str, image: np.ndarray):
+        """Encode an RGB(A) image to file_path; touches no document state, so it is thread-safe"""
         # Convert RGB to BGR for OpenCV
         if len(image.shape) == 3 and image.shape[2] == 3:
             image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
@@ -143,8 +223,6 @@ class Document:
         success = cv2.imwrite(str(file_path), image)
         if not success:
             raise IOError(f"Failed to save image: {file_path}")
-        
-        self.file_path = str(file_path)
     
     def export_document(self, file_path: str):
         """Export the document (same as save for now)"""
@@ -152,26 +230,27 @@ class Document:
     
     def add_layer(self, name: str) -> bool:
         """Add a new layer"""
+        self._composite_dirty = True
         if self.canvas_core:
             layer = self.canvas_core.add_layer(name)
             return layer is not None
         else:
-            # Fallback: create a new layer
-            layer = Layer(name, self.width, self.height)
-            self.layers.append(layer)
-            self.active_layer_index = len(self.layers) - 1
+            # Fallback: append a transparent slot to the layer stack
+            self._append_layer(name)
+            self.active_layer_index = self._layer_count - 1
             return True
     
     def delete_active_layer(self) -> bool:
         """Delete the active layer"""
+        self._composite_dirty = True
         if self.canvas_core and self.active_layer_index >= 0:
             self.canvas_core.remove_layer(self.active_layer_index)
             return True
-        elif self.layers and 0 <= self.active_layer_index < len(self.layers):
-            # Fallback: remove layer from list
-            del self.layers[self.active_layer_index]
-            if self.active_layer_index >= len(self.layers):
-                self.active_layer_index = max(0, len(self.layers) - 1)
+        elif 0 <= self.active_layer_index < self._layer_count:
+            # Fallback: remove the slot from the layer stack
+            self._remove_layer(self.active_layer_index)
+            if self.active_layer_index >= self._layer_count:
+                self.active_layer_index = max(0, self._layer_count - 1)
             return True
         return False
     
@@ -184,7 +263,7 @@ class Document:
         """Get the number of layers"""
         if self.canvas_core:
             return len(self.canvas_core.get_layers())
-        return len(self.layers)
+        return self._layer_count
     
     def get_active_layer_index(self) -> int:
         """Get the active layer index"""
@@ -196,10 +275,44 @@ class Document:
             layers = self.canvas_core.get_layers()
             return [layer.name for layer in layers]
         else:
-            return [layer.name for layer in self.layers]
+            return list(self._layer_names)
     
     def get_composited_image(self) -> Optional[np.ndarray]:
-        """Get the composited image from all layers"""
+        """Get the composited image from all layers (cached; callers must not modify it)"""
+        if self._composite_dirty:
+            self._composite_cache = self._composite()
+            self.composite_changed_rect = None
+        elif self._composite_rect is not None:
+            # Only brush strokes touched the layers: recomposite just their bounding box
+            x0, y0, x1, y1 = self._composite_rect
+            self._composite(self._composite_rect, out=self._composite_cache[y0:y1, x0:x1])
+            self.composite_changed_rect = self._composite_rect
+        else:
+            return self._composite_cache
+        
+        self._composite_rgba = None
+        self._composite_dirty = False
+        self._composite_rect = None
+        self.composite_version += 1
+        return self._composite_cache
+    
+    def get_composited_image_rgba(self) -> Optional[np.ndarray]:
+        """Composited image as a cached (H, W, 4) uint8 RGBA buffer suitable for display"""
+        image = self.get_composited_image()
+        if image is None or not self.canvas_core:
+            return image  # Fallback layers are already stored as uint8 RGBA
+        
+        if self._composite_rgba is None:
+            # The C++ core renders 16-bit BGRA; convert once per composite, not per paint
+            image = np.asarray(image)
+            if image.dtype != np.uint8:
+                image = cv2.convertScaleAbs(image, alpha=1.0 / 257.0)
+            self._composite_rgba = cv2.cvtColor(image, cv2.COLOR_BGRA2RGBA)
+        return self._composite_rgba
+    
+    def _composite(self, rect: Optional[Tuple[int, int, int, int]] = None,
+                   out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Composite all layers into a new image, or only rect (fallback mode) into out"""
         if self.canvas_core:
             # Get composited image from C++ core
             cv_image = self.canvas_core.get_composited_image()
@@ -208,17 +321,30 @@ class Document:
                 return cv_image
         else:
             # Fallback: composite layers manually
-            if not self.layers:
+            n = self._layer_count
+            if n == 0:
                 return None
             
+            layers = self._layer_stack[:n]
+            if rect is not None:
+                x0, y0, x1, y1 = rect
+                layers = layers[:, y0:y1, x0:x1]
+            
+            if NUMBA_AVAILABLE and n > 1:
+                # Composite the whole stack in one compiled pass, no float temporaries
+                return composite_stack(layers, self._visible[:n], self._opacity[:n], out=out)
+            
             # Start with the bottom layer
-            result = self.layers[0].image.copy()
+            result = layers[0].copy()
             
             # Blend remaining layers
-            for layer in self.layers[1:]:
-                if layer.visible and layer.opacity > 0:
-                    result = self._blend_layers(result, layer.image, layer.opacity, layer.blend_mode)
+            for i in range(1, n):
+                if self._visible[i] and self._opacity[i] > 0:
+                    result = self._blend_layers(result, layers[i], float(self._opacity[i]), self._blend_modes[i])
             
+            if out is not None:
+                np.copyto(out, result)
+                return out
             return result
         
         return None
@@ -226,11 +352,22 @@ class Document:
     def _blend_layers(self, base: np.ndarray, overlay: np.ndarray, opacity: float, blend_mode: str) -> np.ndarray:
         """Blend two layers together"""
         if blend_mode == "normal":
-            # Normal blend mode
-            alpha = overlay[:, :, 3:4] / 255.0 * opacity
-            result = base.copy()
-            for c in range(3):  # RGB channels
-                result[:, :, c] = (1 - alpha[:, :, 0]) * base[:, :, c] + alpha[:, :, 0] * overlay[:, :, c]
+            # Normal blend mode in 8-bit fixed point (same rounding as the numba kernel);
+            # every intermediate fits in uint16, so nothing is promoted to float
+            alpha = overlay[..., 3:4].astype(np.uint16)
+            alpha *= int(round(min(max(opacity, 0.0), 1.0) * 256))
+            alpha += 128
+            alpha >>= 8
+            alpha += alpha >> 7  # map 255 -> 256 so full alpha replaces exactly
+            
+            rgb = base[..., :3].astype(np.uint16)
+            rgb *= 256 - alpha
+            rgb += overlay[..., :3] * alpha
+            rgb >>= 8
+            
+            result = np.empty_like(base)
+            np.copyto(result[..., :3], rgb, casting='unsafe')
+            np.maximum(base[..., 3:], overlay[..., 3:], out=result[..., 3:])
             return result
         else:
             # For now, just use normal blend
@@ -238,29 +375,31 @@ class Document:
     
     def undo(self) -> bool:
         """Undo the last action"""
+        self._composite_dirty = True
         if self.canvas_core:
             if self.canvas_core.can_undo():
                 self.canvas_core.undo()
                 return True
         elif self.undo_stack:
-            # Fallback: restore from undo stack
-            state = self.undo_stack.pop()
-            self.redo_stack.append(self._save_state())
-            self._restore_state(state)
+            # Fallback: swap the snapshot tiles back in, keeping what they replace for redo
+            inverse = self._restore_state(self.undo_stack.pop())
+            if inverse is not None:
+                self._push_state(self.redo_stack, inverse)
             return True
         return False
     
     def redo(self) -> bool:
         """Redo the last undone action"""
+        self._composite_dirty = True
         if self.canvas_core:
             if self.canvas_core.can_redo():
                 self.canvas_core.redo()
                 return True
         elif self.redo_stack:
-            # Fallback: restore from redo stack
-            state = self.redo_stack.pop()
-            self.undo_stack.append(self._save_state())
-            self._restore_state(state)
+            # Fallback: swap the snapshot tiles back in, keeping what they replace for undo
+            inverse = self._restore_state(self.redo_stack.pop())
+            if inverse is not None:
+                self._push_state(self.undo_stack, inverse)
             return True
         return False
     
@@ -279,15 +418,16 @@ class Document:
     def apply_filter(self, filter_type: str, params: dict):
         """Apply a filter to the active layer"""
         if self.canvas_core and self.active_layer_index >= 0:
+            self._composite_dirty = True
             self.canvas_core.apply_filter(self.active_layer_index, filter_type, params)
-        elif 0 <= self.active_layer_index < len(self.layers):
+        elif 0 <= self.active_layer_index < self._layer_count and filter_type in self._FALLBACK_FILTERS:
             # Fallback: apply filter to numpy array
             self._save_undo_state()
-            layer = self.layers[self.active_layer_index]
+            layer = Layer(self, self.active_layer_index)
             
             if filter_type == "gaussian_blur":
                 radius = params.get('radius', 5)
-                layer.image = cv2.GaussianBlur(layer.image, (radius * 2 + 1, radius * 2 + 1), 0)
+                cv2.GaussianBlur(layer.image, (radius * 2 + 1, radius * 2 + 1), 0, dst=layer.image)
             elif filter_type == "unsharp_mask":
                 radius = params.get('radius', 3)
                 amount = params.get('amount', 1.0)
@@ -296,127 +436,237 @@ class Document:
                 # Create blurred version
                 blurred = cv2.GaussianBlur(layer.image, (radius * 2 + 1, radius * 2 + 1), 0)
                 
-                # Apply unsharp mask
-                diff = layer.image.astype(np.float32) - blurred.astype(np.float32)
-                mask = np.abs(diff) > threshold
-                layer.image = np.clip(layer.image + diff * amount * mask, 0, 255).astype(np.uint8)
+                # Apply unsharp mask, staying in uint8 throughout
+                if threshold <= 0:
+                    cv2.addWeighted(layer.image, 1.0 + amount, blurred, -amount, 0, dst=layer.image)
+                elif NUMBA_AVAILABLE:
+                    unsharp_threshold(layer.image, blurred, amount, threshold)
+                else:
+                    diff = cv2.subtract(layer.image, blurred, dtype=cv2.CV_16S)
+                    sharpened = cv2.addWeighted(layer.image, 1.0 + amount, blurred, -amount, 0)
+                    np.copyto(layer.image, sharpened, where=np.abs(diff) > threshold)
             elif filter_type == "brightness_contrast":
                 brightness = params.get('brightness', 0)
                 contrast = params.get('contrast', 0)
                 
-                # Apply brightness and contrast
-                layer.image = cv2.convertScaleAbs(layer.image, alpha=1 + contrast/100, beta=brightness)
+                # Apply brightness and contrast in place
+                cv2.convertScaleAbs(layer.image, dst=layer.image, alpha=1 + contrast/100, beta=brightness)
+            
+            # Only filters that changed the layer invalidate the composite; unsupported
+            # ones such as the smudge tool's per-flush call leave it cached
+            self._composite_dirty = True
     
-    def draw_brush_stroke(self, points: List[Tuple[int, int]], size: float, opacity: float, color: Tuple[int, int, int, int]):
+    def draw_brush_stroke(self, points: List[Tuple[int, int]], size: float, opacity: float, color: Tuple[int, int, int, int],
+                          hardness: float = 1.0):
         """Draw a brush stroke on the active layer"""
         if self.canvas_core and self.active_layer_index >= 0:
+            self._composite_dirty = True
             # Convert color to C++ Pixel
             pixel = ngp.Pixel(color[0], color[1], color[2], color[3])
             self.canvas_core.draw_brush_stroke(self.active_layer_index, points, size, opacity, pixel)
-        elif 0 <= self.active_layer_index < len(self.layers):
+        elif 0 <= self.active_layer_index < self._layer_count:
             # Fallback: draw on numpy array
-            self._save_undo_state()
-            layer = self.layers[self.active_layer_index]
-            
             if len(points) < 2:
                 return
             
-            # Draw line segments
-            for i in range(len(points) - 1):
-                pt1 = points[i]
-                pt2 = points[i + 1]
-                
-                # Draw line with thickness
-                cv2.line(layer.image, pt1, pt2, color, thickness=max(1, int(size)), lineType=cv2.LINE_AA)
+            rect = self._stroke_rect(points, size)
+            self._save_undo_state(rect)
+            self._mark_composite_rect(rect)
+            layer = Layer(self, self.active_layer_index)
+            
+            # Round brush honouring opacity and hardness, compiled when numba is available
+            splat_polyline(layer.image, points, size * 0.5, hardness, color, opacity)
     
-    def erase_brush_stroke(self, points: List[Tuple[int, int]], size: float, opacity: float):
+    def erase_brush_stroke(self, points: List[Tuple[int, int]], size: float, opacity: float, hardness: float = 1.0):
         """Erase a brush stroke on the active layer"""
         if self.canvas_core and self.active_layer_index >= 0:
+            self._composite_dirty = True
             self.canvas_core.erase_brush_stroke(self.active_layer_index, points, size, opacity)
-        elif 0 <= self.active_layer_index < len(self.layers):
+        elif 0 <= self.active_layer_index < self._layer_count:
             # Fallback: erase on numpy array
-            self._save_undo_state()
-            layer = self.layers[self.active_layer_index]
-            
             if len(points) < 2:
                 return
             
-            # Erase line segments (set alpha to 0)
-            for i in range(len(points) - 1):
-                pt1 = points[i]
-                pt2 = points[i + 1]
-                
-                # Create mask for erasing
-                mask = np.zeros((self.height, self.width), dtype=np.uint8)
-                cv2.line(mask, pt1, pt2, 255, thickness=max(1, int(size)), lineType=cv2.LINE_AA)
-                
-                # Set alpha to 0 where mask is non-zero
-                layer.image[mask > 0, 3] = 0
-    
-    def _save_undo_state(self):
-        """Save current state for undo"""
-        if len(self.undo_stack) >= self.max_undo_steps:
-            self.undo_stack.pop(0)
-        self.undo_stack.append(self._save_state())
-        self.redo_stack.clear()  # Clear redo stack when new action is performed
-    
-    def _save_state(self) -> dict:
-        """Save current document state"""
-        state = {
-            'layers': [],
-            'active_layer_index': self.active_layer_index
+            rect = self._stroke_rect(points, size)
+            self._save_undo_state(rect)
+            self._mark_composite_rect(rect)
+            layer = Layer(self, self.active_layer_index)
+            
+            splat_polyline(layer.image, points, size * 0.5, hardness, None, opacity, erase=True)
+    
+    def _save_undo_state(self, rect: Optional[Tuple[int, int, int, int]] = None):
+        """Save the active layer's tiles under rect (x0, y0, x1, y1) for undo; whole layer if None"""
+        self._push_state(self.undo_stack, self._save_state(self.active_layer_index, self._tiles_in_rect(rect)))
+        
+        # Clear redo stack when new action is performed
+        for state in self.redo_stack:
+            self._release_state(state)
+        self.redo_stack.clear()
+    
+    def _save_state(self, layer_index: int, tiles) -> dict:
+        """Copy-on-write snapshot of the given (ty, tx) tiles of one layer"""
+        image = self._layer_stack[layer_index]
+        snapshot = {}
+        for tile in tiles:
+            pixels = image[self._tile_slices(tile)]
+            # Edge tiles are smaller than tile_size, so snapshot into a view of a pooled buffer
+            buffer = self._acquire_tile()[:pixels.shape[0], :pixels.shape[1]]
+            np.copyto(buffer, pixels)
+            snapshot[tile] = buffer
+        return {
+            'layer_id': self._layer_ids[layer_index],
+            'tiles': snapshot
         }
+    
+    def _push_state(self, stack: deque, state: dict):
+        """Append a snapshot, recycling the one the bounded stack is about to evict"""
+        if len(stack) == stack.maxlen:
+            self._release_state(stack[0])
+        stack.append(state)
+    
+    def _clear_history(self):
+        """Drop all undo/redo snapshots, returning their buffers to the pool"""
+        for stack in (self.undo_stack, self.redo_stack):
+            for state in stack:
+                self._release_state(state)
+            stack.clear()
+    
+    def _acquire_tile(self) -> np.ndarray:
+        """Full-size tile buffer from the pool, allocating only when it is empty"""
+        if self._tile_pool:
+            return self._tile_pool.pop()
+        return np.empty((self.tile_size, self.tile_size, 4), dtype=np.uint8)
+    
+    def _release_state(self, state: dict):
+        """Return a snapshot's tile buffers to the pool"""
+        for pixels in state['tiles'].values():
+            if len(self._tile_pool) >= self._TILE_POOL_LIMIT:
+                break
+            self._tile_pool.append(pixels if pixels.base is None else pixels.base)
+    
+    def _restore_state(self, state: dict) -> Optional[dict]:
+        """Write snapshot tiles back and return a snapshot of the pixels they replaced"""
+        if state['layer_id'] not in self._layer_ids:
+            self._release_state(state)
+            return None  # The layer was deleted after the snapshot was taken
+        index = self._layer_ids.index(state['layer_id'])
+        inverse = self._save_state(index, state['tiles'])
         
-        for layer in self.layers:
-            layer_state = {
-                'name': layer.name,
-                'visible': layer.visible,
-                'opacity': layer.opacity,
-                'blend_mode': layer.blend_mode,
-                'image': layer.image.copy()
-            }
-            state['layers'].append(layer_state)
+        image = self._layer_stack[index]
+        for tile, pixels in state['tiles'].items():
+            image[self._tile_slices(tile)] = pixels
+        self._release_state(state)
         
-        return state
-    
-    def _restore_state(self, state: dict):
-        """Restore document state"""
-        self.layers = []
-        for layer_state in state['layers']:
-            layer = Layer(layer_state['name'], self.width, self.height)
-            layer.visible = layer_state['visible']
-            layer.opacity = layer_state['opacity']
-            layer.blend_mode = layer_state['blend_mode']
-            layer.image = layer_state['image'].copy()
-            self.layers.append(layer)
+        # Resolve by id; a stored index goes stale once layers below it are removed
+        self.active_layer_index = index
+        return inverse
+    
+    def _tiles_in_rect(self, rect: Optional[Tuple[int, int, int, int]]) -> List[Tuple[int, int]]:
+        """Tile coordinates (ty, tx) overlapping a pixel rect, clipped to the canvas"""
+        if rect is None:
+            x0, y0, x1, y1 = 0, 0, self.width, self.height
+        else:
+            x0, y0 = max(0, rect[0]), max(0, rect[1])
+            x1, y1 = min(self.width, rect[2]), min(self.height, rect[3])
+        if x0 >= x1 or y0 >= y1:
+            return []
         
-        self.active_layer_index = state['active_layer_index']
+        ts = self.tile_size
+        return [(ty, tx)
+                for ty in range(y0 // ts, (y1 - 1) // ts + 1)
+                for tx in range(x0 // ts, (x1 - 1) // ts + 1)]
+    
+    def _tile_slices(self, tile: Tuple[int, int]) -> Tuple[slice, slice]:
+        """Row/column slices of a tile within a layer image"""
+        ty, tx = tile
+        ts = self.tile_size
+        return slice(ty * ts, (ty + 1) * ts), slice(tx * ts, (tx + 1) * ts)
+    
+    @staticmethod
+    def _stroke_rect(points: List[Tuple[int, int]], size: float) -> Tuple[int, int, int, int]:
+        """Bounding box of a stroke, padded by the brush radius and anti-aliasing fringe"""
+        pad = int(size) // 2 + 2
+        points = np.asarray(points).reshape(-1, 2)
+        x0, y0 = points.min(axis=0)
+        x1, y1 = points.max(axis=0)
+        return int(x0) - pad, int(y0) - pad, int(x1) + pad + 1, int(y1) + pad + 1
+    
+    def _mark_composite_rect(self, rect: Tuple[int, int, int, int]):
+        """Record that only pixels inside rect changed, so the next composite can be partial"""
+        x0, y0 = max(0, rect[0]), max(0, rect[1])
+        x1, y1 = min(self.width, rect[2]), min(self.height, rect[3])
+        if x0 >= x1 or y0 >= y1:
+            return
+        if self._composite_rect is not None:
+            px0, py0, px1, py1 = self._composite_rect
+            x0, y0, x1, y1 = min(x0, px0), min(y0, py0), max(x1, px1), max(y1, py1)
+        self._composite_rect = (x0, y0, x1, y1)
     
     def _create_fallback_canvas(self, image: Optional[np.ndarray] = None):
         """Create a fallback canvas using numpy arrays"""
+        self._allocate_layer_stack(1)
+        bg_layer = self._append_layer("Background")
         if image is not None:
             # Create background layer with the image
-            bg_layer = Layer("Background", self.width, self.height)
-            bg_layer.image = image.copy()
-            self.layers = [bg_layer]
+            bg_layer.image = image
         else:
-            # Create a white canvas
-            bg_layer = Layer("Background", self.width, self.height)
-            bg_layer.image = np.ones((self.height, self.width, 4), dtype=np.uint8) * 255
-            bg_layer.image[:, :, 3] = 255  # Alpha channel
-            self.layers = [bg_layer]
+            # Opaque white canvas, filled in place in the layer stack
+            bg_layer.image.fill(255)
         
         self.active_layer_index = 0
     
+    @property
+    def layers(self) -> List[Layer]:
+        """Views onto the fallback layer stack, bottom to top"""
+        return [Layer(self, i) for i in range(self._layer_count)]
+    
+    def _allocate_layer_stack(self, capacity: int):
+        """Allocate empty SoA layer storage for the current canvas size"""
+        capacity = max(1, capacity)
+        self._layer_stack = np.empty((capacity, self.height, self.width, 4), dtype=np.uint8)
+        self._visible = np.ones(capacity, dtype=np.bool_)
+        self._opacity = np.ones(capacity, dtype=np.float32)
+        self._layer_names = []
+        self._blend_modes = []
+        self._layer_ids = []  # Stable ids so undo snapshots survive layer reordering
+        self._layer_count = 0
+    
+    def _append_layer(self, name: str) -> Layer:
+        """Append a transparent layer, doubling stack capacity when full"""
+        n = self._layer_count
+        capacity = self._layer_stack.shape[0]
+        if n == capacity:
+            stack = np.empty((capacity * 2, self.height, self.width, 4), dtype=np.uint8)
+            stack[:n] = self._layer_stack[:n]
+            self._layer_stack = stack
+            self._visible = np.concatenate([self._visible, np.ones(capacity, dtype=np.bool_)])
+            self._opacity = np.concatenate([self._opacity, np.ones(capacity, dtype=np.float32)])
+        
+        self._layer_stack[n] = 0  # Transparent by default
+        self._visible[n] = True
+        self._opacity[n] = 1.0
+        self._layer_names.append(name)
+        self._blend_modes.append("normal")
+        self._layer_ids.append(self._next_layer_id)
+        self._next_layer_id += 1
+        self._layer_count = n + 1
+        return Layer(self, n)
+    
+    def _remove_layer(self, index: int):
+        """Remove a layer slot, shifting the layers above it down"""
+        n = self._layer_count
+        self._layer_stack[index:n - 1] = self._layer_stack[index + 1:n]
+        self._visible[index:n - 1] = self._visible[index + 1:n]
+        self._opacity[index:n - 1] = self._opacity[index + 1:n]
+        del self._layer_names[index]
+        del self._blend_modes[index]
+        del self._layer_ids[index]
+        self._layer_count = n - 1
+    
     def _load_image_to_layer(self, layer, image: np.ndarray):
         """Load an image into a layer"""
         if not ngp:
             return
         
-        # Convert numpy array to C++ TileGrid
-        tile_grid = layer.get_pixels()
-        
-        # For now, just fill with a solid color
-        # In a real implementation, you would convert the numpy array to tiles
-        pixel = ngp.Pixel(255, 255, 255, 255)
-        tile_grid.fill(pixel) 
\ No newline at end of file
+        # Hand the whole buffer to the C++ TileGrid in a single call
+        layer.get_pixels().load_from_numpy(np.ascontiguousarray(image, dtype=np.uint8)) 
\ No newline at end of file
@@ -7,6 +7,25 @@ import os
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+# Prefer orjson's C parser/serialiser, falling back to the standard library
+try:
+    import orjson
+    
+    def _loads(data: bytes) -> Any:
+        return orjson.loads(data)
+    
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _loads(data: bytes) -> Any:
+        return json.loads(data)
+    
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+# Sentinel distinguishing "not cached" from a cached None
+_MISSING = object()
+
 
 class Settings:
     """Application settings manager"""
@@ -21,6 +40,7 @@ class Settings:
         
         self.config_file = Path(config_file)
         self._settings = self._load_default_settings()
+        self._flat_cache: Dict[str, Any] = {}  # Resolved dot-notation lookups
         self.load()
     
     def _load_default_settings(self) -> Dict[str, Any]:
@@ -74,9 +94,9 @@ class Settings:
         """Load settings from file"""
         if self.config_file.exists():
             try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    loaded_settings = json.load(f)
-                    self._merge_settings(loaded_settings)
+                loaded_settings = _loads(self.config_file.read_bytes())
+                self._merge_settings(loaded_settings)
+                self._flat_cache.clear()
             except (json.JSONDecodeError, IOError) as e:
                 print(f"Warning: Could not load settings from {self.config_file}: {e}")
     
@@ -86,9 +106,9 @@ class Settings:
             # Ensure directory exists
             self.config_file.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self._settings, f, indent=2, ensure_ascii=False)
-        except IOError as e:
+            self.config_file.write_bytes(_dumps(self._settings))
+        except (TypeError, IOError) as e:
+            # TypeError covers unserialisable values and keys (orjson's JSONEncodeError subclasses it)
             print(f"Error: Could not save settings to {self.config_file}: {e}")
     
     def _merge_settings(self, loaded_settings: Dict[str, Any]) -> None:
@@ -104,15 +124,21 @@ class Settings:
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get a setting value using dot notation (e.g., 'ui.theme')"""
+        value = self._flat_cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        
         keys = key.split('.')
         value = self._settings
         
         try:
             for k in keys:
                 value = value[k]
-            return value
         except (KeyError, TypeError):
             return default
+        
+        self._flat_cache[key] = value
+        return value
     
     def set(self, key: str, value: Any) -> None:
         """Set a setting value using dot notation (e.g., 'ui.theme')"""
@@ -127,10 +153,17 @@ class Settings:
         
         # Set the value
         target[keys[-1]] = value
+        
+        # Drop cached lookups of this key and anything nested beneath it
+        self._flat_cache.pop(key, None)
+        prefix = key + '.'
+        for cached_key in [k for k in self._flat_cache if k.startswith(prefix)]:
+            del self._flat_cache[cached_key]
     
     def reset_to_defaults(self) -> None:
         """Reset all settings to default values"""
         self._settings = self._load_default_settings()
+        self._flat_cache.clear()
         self.save()
     
     def get_all(self) -> Dict[str, Any]:
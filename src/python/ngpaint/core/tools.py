@@ -2,13 +2,14 @@
 Tools system for drawing and editing
 """
 
-from abc import ABC, abstractmethod
-from typing import List, Tuple, Optional
+from typing import ClassVar, List, Tuple, Optional
+
+import numpy as np
 
 # Try to import PySide6, fallback to dummy classes if not available
 try:
-    from PySide6.QtCore import Signal, QObject, QPoint
-    from PySide6.QtGui import QPainter, QColor, QPen, QBrush
+    from PySide6.QtCore import Qt, Signal, QObject, QPoint, QRect, QTimer
+    from PySide6.QtGui import QPainter, QColor, QPen, QBrush, QPolygon
     PYSIDE6_AVAILABLE = True
     print("Successfully imported PySide6")
 except ImportError as e:
@@ -18,6 +19,11 @@ except ImportError as e:
     PYSIDE6_AVAILABLE = False
     
     # Create dummy classes for fallback
+    class Qt:
+        RoundCap = None
+        RoundJoin = None
+        DashLine = None
+    
     class QObject:
         def __init__(self):
             pass
@@ -25,12 +31,44 @@ except ImportError as e:
     class Signal:
         def __init__(self, *args):
             pass
+        
+        def connect(self, slot):
+            pass
+        
+        def emit(self, *args):
+            pass
     
     class QPoint:
         def __init__(self, x=0, y=0):
             self.x = lambda: x
             self.y = lambda: y
     
+    class QRect:
+        def __init__(self, x=0, y=0, width=0, height=0):
+            self.x = lambda: x
+            self.y = lambda: y
+            self.width = lambda: width
+            self.height = lambda: height
+    
+    class QTimer:
+        def __init__(self, *args):
+            self.timeout = Signal()
+        
+        def setSingleShot(self, single_shot):
+            pass
+        
+        def setInterval(self, msec):
+            pass
+        
+        def isActive(self):
+            return False
+        
+        def start(self):
+            pass
+        
+        def stop(self):
+            pass
+    
     class QPainter:
         def __init__(self, *args):
             pass
@@ -46,6 +84,10 @@ except ImportError as e:
     class QBrush:
         def __init__(self, *args):
             pass
+    
+    class QPolygon(list):
+        def clear(self):
+            del self[:]
 
 class Tool(QObject):
     """Base class for all tools"""
@@ -53,317 +95,431 @@ class Tool(QObject):
     # Signals
     tool_changed = Signal(str)
     
+    # Property names stored as plain attributes on each concrete tool, so hot paths
+    # read self.size etc. directly instead of going through a properties dict
+    _PROPERTIES = ()
+    
+    # Tool category, used by the UI to pick matching controls without parsing name
+    KIND: ClassVar[str] = ''
+    
     def __init__(self, name: str):
         super().__init__()
         self.name = name
         self.active = False
-        self.properties = {}
         self.document = None
+        self._extra_properties = {}  # Properties this tool does not define
     
-    @abstractmethod
     def mouse_press(self, pos: QPoint):
         """Handle mouse press event"""
         pass
     
-    @abstractmethod
     def mouse_move(self, pos: QPoint):
         """Handle mouse move event"""
         pass
     
-    @abstractmethod
     def mouse_release(self, pos: QPoint):
         """Handle mouse release event"""
         pass
     
-    @abstractmethod
     def draw_preview(self, painter: QPainter, zoom: float):
         """Draw tool preview"""
         pass
     
+    def preview_rect(self) -> Optional[Tuple[int, int, int, int]]:
+        """Document-space (x0, y0, x1, y1) box draw_preview paints into, None if unknown"""
+        return None
+    
+    @property
+    def properties(self) -> dict:
+        """Snapshot of all tool properties by name"""
+        props = {name: getattr(self, name) for name in self._PROPERTIES}
+        props.update(self._extra_properties)
+        return props
+    
     def set_property(self, name: str, value):
         """Set a tool property"""
-        self.properties[name] = value
+        if name in self._PROPERTIES:
+            setattr(self, name, value)
+        else:
+            self._extra_properties[name] = value
     
     def get_property(self, name: str, default=None):
         """Get a tool property"""
-        return self.properties.get(name, default)
+        if name in self._PROPERTIES:
+            return getattr(self, name)
+        return self._extra_properties.get(name, default)
     
     def set_document(self, document):
         """Set the document for this tool"""
         self.document = document
 
 
-class BrushTool(Tool):
+class StrokeTool(Tool):
+    """Base class for tools that apply an effect along the pointer path
+    
+    Pointer samples are buffered and sent to the document as one polyline per
+    flush interval, instead of one two-point call per mouse event.
+    """
+    
+    # Delay before buffered stroke points are applied, in milliseconds
+    FLUSH_INTERVAL_MS = 6
+    
+    # Emitted with the document-space (x0, y0, x1, y1) box touched by each flush
+    stroke_flushed = Signal(tuple)
+    
+    # Initial capacity of the stroke point buffer; it doubles when full
+    INITIAL_POINT_CAPACITY = 4096
+    
+    # Maximum number of preview pens kept per tool
+    PEN_CACHE_SIZE = 8
+    
+    # Upper bound on the spacing skip, in pixels, so large brushes still follow curves
+    MAX_POINT_SPACING = 3.0
+    
+    def __init__(self, name: str):
+        super().__init__(name)
+        # Stroke points live in one contiguous int32 (N, 2) buffer; the document
+        # receives views into it rather than per-event lists of tuples
+        self._pts = np.empty((self.INITIAL_POINT_CAPACITY, 2), dtype=np.int32)
+        self._n = 0
+        self._flushed = 0  # Index of the first point not yet sent to the document
+        self._last_x = self._last_y = 0  # Last buffered point, as plain ints
+        self._preview = QPolygon()  # Same points, kept natively for drawPolyline
+        self._pen_cache = {}  # (rgba, width) -> QPen
+        self._preview_key = None  # (size, zoom) the preview width was computed for
+        self._preview_width = 1.0
+        
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush_stroke)
+    
+    @property
+    def stroke_points(self) -> np.ndarray:
+        """(N, 2) int32 view of the current stroke's points"""
+        return self._pts[:self._n]
+    
+    def _begin_stroke(self, pos: QPoint):
+        """Start buffering a new stroke at pos"""
+        self._last_x, self._last_y = pos.x(), pos.y()
+        self._pts[0] = (self._last_x, self._last_y)
+        self._n = 1
+        self._flushed = 0
+        self._preview.clear()
+        self._preview.append(pos)
+    
+    def _queue_point(self, pos: QPoint, force: bool = False):
+        """Buffer a stroke point and schedule a flush; force bypasses the spacing skip"""
+        x, y = pos.x(), pos.y()
+        if x == self._last_x and y == self._last_y:
+            return  # Repeated sample, nothing new to draw
+        if not force and abs(x - self._last_x) + abs(y - self._last_y) < self._min_point_distance():
+            return
+        self._last_x, self._last_y = x, y
+        
+        if self._n == len(self._pts):
+            self._pts = np.concatenate([self._pts, np.empty_like(self._pts)])
+        self._pts[self._n] = (x, y)
+        self._n += 1
+        self._preview.append(pos)
+        if self.document and not self._flush_timer.isActive():
+            self._flush_timer.start()
+    
+    def _end_stroke(self, pos: QPoint):
+        """Queue the release sample, apply any buffered points and reset the stroke"""
+        self._queue_point(pos, force=True)
+        self.flush_stroke()
+        self._n = 0
+        self._flushed = 0
+        self._preview.clear()
+    
+    def flush_stroke(self):
+        """Send buffered points to the document in a single call"""
+        self._flush_timer.stop()
+        points = self._pts[self._flushed:self._n]
+        if self.document and len(points) >= 2:
+            self._apply_points(points)
+            # Keep the last point so the next batch continues the same polyline
+            self._flushed = self._n - 1
+            self.stroke_flushed.emit(self._points_rect(points))
+    
+    def _min_point_distance(self) -> float:
+        """Pointer travel (Manhattan, in pixels) needed before another point is kept"""
+        return 0.0
+    
+    def _preview_pen_width(self, zoom: float) -> float:
+        """Preview pen width in document units, at least one screen pixel wide"""
+        key = (self.size, zoom)
+        if key != self._preview_key:
+            # The canvas painter is already scaled by zoom, so only the floor needs it
+            self._preview_key = key
+            self._preview_width = max(float(self.size), 1.0 / zoom)
+        return self._preview_width
+    
+    def _preview_pen(self, color: Tuple[int, int, int, int], width: float) -> QPen:
+        """Round-capped preview pen, built once per (color, width)"""
+        key = (tuple(color), width)
+        pen = self._pen_cache.get(key)
+        if pen is None:
+            if len(self._pen_cache) >= self.PEN_CACHE_SIZE:
+                self._pen_cache.clear()
+            pen = QPen(QColor(*key[0]))
+            pen.setWidthF(width)
+            pen.setCapStyle(Qt.RoundCap)
+            pen.setJoinStyle(Qt.RoundJoin)
+            self._pen_cache[key] = pen
+        return pen
+    
+    def _points_rect(self, points: np.ndarray) -> Tuple[int, int, int, int]:
+        """Bounding box of points padded by the brush radius and anti-aliasing fringe"""
+        pad = int(self.size) // 2 + 2
+        x0, y0 = points.min(axis=0)
+        x1, y1 = points.max(axis=0)
+        return int(x0) - pad, int(y0) - pad, int(x1) + pad + 1, int(y1) + pad + 1
+    
+    def _apply_points(self, points: np.ndarray):
+        """Apply the tool along an (N, 2) int32 polyline of canvas points"""
+        pass
+
+
+class BrushTool(StrokeTool):
     """Brush tool for drawing"""
     
+    _PROPERTIES = ('size', 'opacity', 'color', 'hardness', 'spacing')
+    KIND = 'brush'
+    
     def __init__(self):
         super().__init__("Brush")
-        self.stroke_points = []
         self.is_drawing = False
         
         # Default properties
-        self.properties = {
-            'size': 10.0,
-            'opacity': 1.0,
-            'color': (255, 0, 0, 255),  # Red
-            'hardness': 0.5,
-            'spacing': 0.25
-        }
+        self.size = 10.0
+        self.opacity = 1.0
+        self.color = (255, 0, 0, 255)  # Red
+        self.hardness = 0.5
+        self.spacing = 0.25
     
     def mouse_press(self, pos: QPoint):
         """Handle mouse press event"""
         self.is_drawing = True
-        self.stroke_points = [pos]
+        self._begin_stroke(pos)
         
         # Start stroke in document
         if self.document:
             # Convert QPoint to tuple for document
             point_tuple = (pos.x(), pos.y())
-            self.document.draw_brush_stroke([point_tuple], 
-                                          self.get_property('size'),
-                                          self.get_property('opacity'),
-                                          self.get_property('color'))
+            self.document.draw_brush_stroke([point_tuple], self.size, self.opacity, self.color)
     
     def mouse_move(self, pos: QPoint):
         """Handle mouse move event"""
         if self.is_drawing:
-            self.stroke_points.append(pos)
-            
-            # Draw stroke in document
-            if self.document and len(self.stroke_points) >= 2:
-                color = self.get_property('color')
-                size = self.get_property('size')
-                opacity = self.get_property('opacity')
-                
-                # Convert QPoints to tuples
-                points = [(p.x(), p.y()) for p in self.stroke_points[-2:]]
-                self.document.draw_brush_stroke(points, size, opacity, color)
+            self._queue_point(pos)
     
     def mouse_release(self, pos: QPoint):
         """Handle mouse release event"""
         if self.is_drawing:
             self.is_drawing = False
-            self.stroke_points = []
+            self._end_stroke(pos)
+    
+    def _min_point_distance(self) -> float:
+        """Brush spacing is a fraction of the brush size, capped at MAX_POINT_SPACING"""
+        return min(self.spacing * self.size, self.MAX_POINT_SPACING)
+    
+    def _apply_points(self, points: np.ndarray):
+        """Draw the buffered stroke segment in the document"""
+        self.document.draw_brush_stroke(points, self.size, self.opacity, self.color, self.hardness)
     
     def draw_preview(self, painter: QPainter, zoom: float):
         """Draw brush preview"""
-        if not self.stroke_points:
+        if self._n == 0:
             return
         
         # Set up pen for preview
-        color = self.get_property('color')
-        size = self.get_property('size') * zoom
-        
-        pen = QPen(QColor(color[0], color[1], color[2], color[3]))
-        pen.setWidth(max(1, int(size)))
-        pen.setCapStyle(QPen.RoundCap)
-        pen.setJoinStyle(QPen.RoundJoin)
-        painter.setPen(pen)
+        painter.setPen(self._preview_pen(self.color, self._preview_pen_width(zoom)))
         
-        # Draw preview lines
-        for i in range(len(self.stroke_points) - 1):
-            start = self.stroke_points[i]
-            end = self.stroke_points[i + 1]
-            painter.drawLine(start, end)
+        # Draw preview lines in one native call
+        painter.drawPolyline(self._preview)
 
 
-class EraserTool(Tool):
+class EraserTool(StrokeTool):
     """Eraser tool for erasing"""
     
+    _PROPERTIES = ('size', 'opacity', 'hardness')
+    KIND = 'eraser'
+    
     def __init__(self):
         super().__init__("Eraser")
-        self.stroke_points = []
         self.is_erasing = False
         
         # Default properties
-        self.properties = {
-            'size': 20.0,
-            'opacity': 1.0,
-            'hardness': 0.5
-        }
+        self.size = 20.0
+        self.opacity = 1.0
+        self.hardness = 0.5
     
     def mouse_press(self, pos: QPoint):
         """Handle mouse press event"""
         self.is_erasing = True
-        self.stroke_points = [pos]
+        self._begin_stroke(pos)
         
         # Start erasing in document
         if self.document:
             point_tuple = (pos.x(), pos.y())
-            self.document.erase_brush_stroke([point_tuple],
-                                           self.get_property('size'),
-                                           self.get_property('opacity'))
+            self.document.erase_brush_stroke([point_tuple], self.size, self.opacity)
     
     def mouse_move(self, pos: QPoint):
         """Handle mouse move event"""
         if self.is_erasing:
-            self.stroke_points.append(pos)
-            
-            # Erase stroke in document
-            if self.document and len(self.stroke_points) >= 2:
-                size = self.get_property('size')
-                opacity = self.get_property('opacity')
-                
-                # Convert QPoints to tuples
-                points = [(p.x(), p.y()) for p in self.stroke_points[-2:]]
-                self.document.erase_brush_stroke(points, size, opacity)
+            self._queue_point(pos)
     
     def mouse_release(self, pos: QPoint):
         """Handle mouse release event"""
         if self.is_erasing:
             self.is_erasing = False
-            self.stroke_points = []
+            self._end_stroke(pos)
+    
+    def _apply_points(self, points: np.ndarray):
+        """Erase along the buffered stroke segment in the document"""
+        self.document.erase_brush_stroke(points, self.size, self.opacity, self.hardness)
     
     def draw_preview(self, painter: QPainter, zoom: float):
         """Draw eraser preview"""
-        if not self.stroke_points:
+        if self._n == 0:
             return
         
         # Set up pen for preview (white with transparency)
-        size = self.get_property('size') * zoom
+        painter.setPen(self._preview_pen((255, 255, 255, 128), self._preview_pen_width(zoom)))
         
-        pen = QPen(QColor(255, 255, 255, 128))
-        pen.setWidth(max(1, int(size)))
-        pen.setCapStyle(QPen.RoundCap)
-        pen.setJoinStyle(QPen.RoundJoin)
-        painter.setPen(pen)
-        
-        # Draw preview lines
-        for i in range(len(self.stroke_points) - 1):
-            start = self.stroke_points[i]
-            end = self.stroke_points[i + 1]
-            painter.drawLine(start, end)
+        # Draw preview lines in one native call
+        painter.drawPolyline(self._preview)
 
 
-class SmudgeTool(Tool):
+class SmudgeTool(StrokeTool):
     """Smudge tool for blending colors"""
     
+    _PROPERTIES = ('size', 'opacity', 'strength')
+    KIND = 'smudge'
+    
     def __init__(self):
         super().__init__("Smudge")
-        self.stroke_points = []
         self.is_smudging = False
         
         # Default properties
-        self.properties = {
-            'size': 15.0,
-            'opacity': 0.8,
-            'strength': 0.5
-        }
+        self.size = 15.0
+        self.opacity = 0.8
+        self.strength = 0.5
     
     def mouse_press(self, pos: QPoint):
         """Handle mouse press event"""
         self.is_smudging = True
-        self.stroke_points = [pos]
+        self._begin_stroke(pos)
         
         # Start smudge in document
         if self.document:
             params = {
-                'strength': self.get_property('strength'),
-                'size': self.get_property('size')
+                'strength': self.strength,
+                'size': self.size
             }
             self.document.apply_filter('smudge', params)
     
     def mouse_move(self, pos: QPoint):
         """Handle mouse move event"""
         if self.is_smudging:
-            self.stroke_points.append(pos)
-            
-            # Apply smudge in document
-            if self.document and len(self.stroke_points) >= 2:
-                params = {
-                    'strength': self.get_property('strength'),
-                    'size': self.get_property('size'),
-                    'points': [(p.x(), p.y()) for p in self.stroke_points[-2:]]
-                }
-                self.document.apply_filter('smudge', params)
+            self._queue_point(pos)
     
     def mouse_release(self, pos: QPoint):
         """Handle mouse release event"""
         if self.is_smudging:
             self.is_smudging = False
-            self.stroke_points = []
+            self._end_stroke(pos)
+    
+    def _apply_points(self, points: np.ndarray):
+        """Smudge along the buffered stroke segment in the document"""
+        params = {
+            'strength': self.strength,
+            'size': self.size,
+            'points': points.tolist()
+        }
+        self.document.apply_filter('smudge', params)
     
     def draw_preview(self, painter: QPainter, zoom: float):
         """Draw smudge preview"""
-        if not self.stroke_points:
+        if self._n == 0:
             return
         
         # Set up pen for preview (blend color)
-        size = self.get_property('size') * zoom
+        painter.setPen(self._preview_pen((128, 128, 128, 128), self._preview_pen_width(zoom)))
         
-        pen = QPen(QColor(128, 128, 128, 128))
-        pen.setWidth(max(1, int(size)))
-        pen.setCapStyle(QPen.RoundCap)
-        pen.setJoinStyle(QPen.RoundJoin)
-        painter.setPen(pen)
-        
-        # Draw preview lines
-        for i in range(len(self.stroke_points) - 1):
-            start = self.stroke_points[i]
-            end = self.stroke_points[i + 1]
-            painter.drawLine(start, end)
+        # Draw preview lines in one native call
+        painter.drawPolyline(self._preview)
 
 
 class SelectionTool(Tool):
     """Selection tool for creating selections"""
     
+    _PROPERTIES = ('feather', 'mode')
+    KIND = 'selection'
+    
+    # Marquee outline and fill, shared by every paint
+    SELECTION_PEN = QPen(QColor(0, 120, 215, 255), 2, Qt.DashLine)  # Blue selection color
+    SELECTION_BRUSH = QBrush(QColor(0, 120, 215, 30))  # Semi-transparent blue
+    
     def __init__(self):
         super().__init__("Selection")
         self.start_pos = None
         self.end_pos = None
         self.is_selecting = False
+        self._rect = None  # Selection rectangle, recomputed only when the drag moves
         
         # Default properties
-        self.properties = {
-            'feather': 0,
-            'mode': 'replace'  # replace, add, subtract, intersect
-        }
+        self.feather = 0
+        self.mode = 'replace'  # replace, add, subtract, intersect
     
     def mouse_press(self, pos: QPoint):
         """Handle mouse press event"""
         self.is_selecting = True
         self.start_pos = pos
         self.end_pos = pos
+        self._rect = self._get_selection_rect()
     
     def mouse_move(self, pos: QPoint):
         """Handle mouse move event"""
         if self.is_selecting:
             self.end_pos = pos
+            self._rect = self._get_selection_rect()
     
     def mouse_release(self, pos: QPoint):
         """Handle mouse release event"""
         if self.is_selecting:
             self.is_selecting = False
             self.end_pos = pos
+            self._rect = self._get_selection_rect()
             self._create_selection()
     
     def draw_preview(self, painter: QPainter, zoom: float):
         """Draw selection preview"""
-        if not self.start_pos or not self.end_pos:
+        if self._rect is None:
             return
         
-        # Set up pen for selection rectangle
-        pen = QPen(QColor(0, 120, 215, 255))  # Blue selection color
-        pen.setWidth(2)
-        pen.setStyle(QPen.DashLine)
-        painter.setPen(pen)
-        
-        # Set up brush for selection fill
-        brush = QBrush(QColor(0, 120, 215, 30))  # Semi-transparent blue
-        painter.setBrush(brush)
-        
         # Draw selection rectangle
-        rect = self._get_selection_rect()
-        painter.drawRect(rect)
+        painter.setPen(self.SELECTION_PEN)
+        painter.setBrush(self.SELECTION_BRUSH)
+        painter.drawRect(self._rect)
+    
+    def preview_rect(self) -> Optional[Tuple[int, int, int, int]]:
+        """Document-space box covered by the marquee, padded for its pen"""
+        rect = self._rect
+        if rect is None:
+            return (0, 0, 0, 0)
+        pad = self.SELECTION_PEN.width()
+        x, y = rect.x(), rect.y()
+        return x - pad, y - pad, x + rect.width() + pad + 1, y + rect.height() + pad + 1
     
     def _create_selection(self):
         """Create the selection"""
-        if not self.start_pos or not self.end_pos:
+        rect = self._rect
+        if rect is None:
             return
         
-        # Get selection rectangle
-        rect = self._get_selection_rect()
-        
         # Apply selection to document
         if self.document:
             params = {
@@ -371,14 +527,14 @@ class SelectionTool(Tool):
                 'y': rect.y(),
                 'width': rect.width(),
                 'height': rect.height(),
-                'feather': self.get_property('feather'),
-                'mode': self.get_property('mode')
+                'feather': self.feather,
+                'mode': self.mode
             }
             self.document.apply_filter('selection', params)
     
     def _get_selection_rect(self):
         """Get the selection rectangle"""
-        if not self.start_pos or not self.end_pos:
+        if self.start_pos is None or self.end_pos is None:
             return None
         
         # Convert QPoints to coordinates
@@ -386,7 +542,6 @@ class SelectionTool(Tool):
         x2, y2 = self.end_pos.x(), self.end_pos.y()
         
         # Create rectangle
-        from PySide6.QtCore import QRect
         return QRect(min(x1, x2), min(y1, y2), abs(x2 - x1), abs(y2 - y1))
 
 
@@ -397,6 +552,7 @@ class ToolManager(QObject):
     tool_changed = Signal(object)
     color_changed = Signal(tuple)
     property_changed = Signal(str, object)
+    stroke_flushed = Signal(tuple)
     
     def __init__(self):
         super().__init__()
@@ -413,6 +569,11 @@ class ToolManager(QObject):
         self.tools['eraser'] = EraserTool()
         self.tools['smudge'] = SmudgeTool()
         self.tools['selection'] = SelectionTool()
+        
+        # Relay batched stroke updates so the canvas can repaint just the touched area
+        for tool in self.tools.values():
+            if isinstance(tool, StrokeTool):
+                tool.stroke_flushed.connect(self.stroke_flushed)
     
     def _set_default_tool(self):
         """Set the default tool"""
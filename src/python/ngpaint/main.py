@@ -19,6 +19,10 @@ from .core.settings import Settings
 
 def main():
     """Main application entry point"""
+    # Merge queued mouse moves so handlers only see the newest position (Qt's default,
+    # pinned here). Tablet events stay uncompressed: every pen sample shapes the stroke
+    QApplication.setAttribute(Qt.AA_CompressHighFrequencyEvents, True)
+    
     app = QApplication(sys.argv)
     app.setApplicationName("Next-Gen Paint")
     app.setApplicationVersion("1.0.0")
@@ -3,21 +3,18 @@ Canvas widget for drawing and interaction
 """
 
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QScrollArea, QSizePolicy
-from PySide6.QtCore import Qt, Signal, QPoint, QRect
-from PySide6.QtGui import QPainter, QPixmap, QColor, QPen, QBrush, QMouseEvent, QWheelEvent, QImage
-import cv2
+from PySide6.QtCore import Qt, Signal, QEvent, QPoint, QRect, QRectF, QTimer
+from PySide6.QtGui import QPainter, QPixmap, QColor, QPen, QBrush, QMouseEvent, QWheelEvent, QImage, QRegion
 import numpy as np
 
 from ..core.document import Document
-from ..core.tools import Tool
+from ..core._kernels import blend_over_checker
+from ..core.tools import Tool, StrokeTool
 
 class CanvasWidget(QWidget):
     """Canvas widget for drawing and interaction"""
     
     # Signals
-    mouse_pressed = Signal(QPoint)
-    mouse_moved = Signal(QPoint)
-    mouse_released = Signal(QPoint)
     zoom_changed = Signal(float)
     
     def __init__(self, document: Document):
@@ -29,8 +26,19 @@ class CanvasWidget(QWidget):
         self.is_panning = False
         self.last_mouse_pos = QPoint()
         
+        # Bound handlers of the current tool, looked up once per tool change. Mouse
+        # events call them directly; stroke tools repaint their own dirty rects
+        self._tool_press = self._tool_move = self._tool_release = None
+        self._repaint_on_move = False
+        self._last_preview_rect = None  # Where the tool preview was last painted
+        
+        # Widget -> document mapping, refreshed when the canvas moves or the zoom changes
+        self._canvas_origin = QPoint(0, 0)
+        self._inv_zoom = 1.0 / self.zoom
+        
         self.setup_ui()
         self.setup_canvas()
+        self.canvas.installEventFilter(self)
         
         # Set widget properties
         self.setFocusPolicy(Qt.StrongFocus)
@@ -62,12 +70,34 @@ class CanvasWidget(QWidget):
     def set_tool(self, tool: Tool):
         """Set the current tool"""
         self.current_tool = tool
+        self._tool_press = tool.mouse_press if tool else None
+        self._tool_move = tool.mouse_move if tool else None
+        self._tool_release = tool.mouse_release if tool else None
+        self._repaint_on_move = tool is not None and not isinstance(tool, StrokeTool)
         self.canvas.set_tool(tool)
     
     def update_canvas(self):
         """Update the canvas display"""
         self.canvas.update()
     
+    def update_canvas_rect(self, rect: tuple):
+        """Repaint only the canvas area covering a document-space (x0, y0, x1, y1) box"""
+        x0, y0, x1, y1 = rect
+        widget_rect = QRectF(x0 * self.zoom + self.pan_offset.x(), y0 * self.zoom + self.pan_offset.y(),
+                             (x1 - x0) * self.zoom, (y1 - y0) * self.zoom)
+        self.canvas.update(widget_rect.toAlignedRect().adjusted(-1, -1, 1, 1))
+    
+    def _repaint_tool_preview(self):
+        """Repaint where the tool preview was and now is, or everything if the tool can't say"""
+        rect = self.current_tool.preview_rect()
+        last, self._last_preview_rect = self._last_preview_rect, rect
+        if rect is None or last is None:
+            self.canvas.update()
+            return
+        for box in (last, rect):
+            if box[2] > box[0] and box[3] > box[1]:
+                self.update_canvas_rect(box)
+    
     def mousePressEvent(self, event: QMouseEvent):
         """Handle mouse press events"""
         if event.button() == Qt.LeftButton:
@@ -79,9 +109,10 @@ class CanvasWidget(QWidget):
             else:
                 # Tool interaction
                 canvas_pos = self.map_to_canvas(event.pos())
-                self.mouse_pressed.emit(canvas_pos)
-                if self.current_tool:
-                    self.current_tool.mouse_press(canvas_pos)
+                if self._tool_press:
+                    self._tool_press(canvas_pos)
+                    self._last_preview_rect = self.current_tool.preview_rect()
+                    self.canvas.update()
         elif event.button() == Qt.MiddleButton:
             # Start panning
             self.is_panning = True
@@ -99,9 +130,10 @@ class CanvasWidget(QWidget):
         else:
             # Tool interaction
             canvas_pos = self.map_to_canvas(event.pos())
-            self.mouse_moved.emit(canvas_pos)
-            if self.current_tool:
-                self.current_tool.mouse_move(canvas_pos)
+            if self._tool_move:
+                self._tool_move(canvas_pos)
+                if self._repaint_on_move:
+                    self._repaint_tool_preview()
     
     def mouseReleaseEvent(self, event: QMouseEvent):
         """Handle mouse release events"""
@@ -113,9 +145,10 @@ class CanvasWidget(QWidget):
             else:
                 # Tool interaction
                 canvas_pos = self.map_to_canvas(event.pos())
-                self.mouse_released.emit(canvas_pos)
-                if self.current_tool:
-                    self.current_tool.mouse_release(canvas_pos)
+                if self._tool_release:
+                    self._tool_release(canvas_pos)
+                    self._last_preview_rect = self.current_tool.preview_rect()
+                    self.canvas.update()
     
     def wheelEvent(self, event: QWheelEvent):
         """Handle wheel events for zooming"""
@@ -126,6 +159,8 @@ class CanvasWidget(QWidget):
             self.zoom *= zoom_factor
             self.zoom = max(0.1, min(10.0, self.zoom))
             
+            self._inv_zoom = 1.0 / self.zoom
+            
             self.canvas.set_zoom(self.zoom)
             self.zoom_changed.emit(self.zoom)
             
@@ -134,15 +169,39 @@ class CanvasWidget(QWidget):
             # Scroll
             super().wheelEvent(event)
     
+    def eventFilter(self, obj, event) -> bool:
+        """Track canvas moves (scrolling, relayout) for map_to_canvas"""
+        if obj is self.canvas and event.type() == QEvent.Move:
+            self._canvas_origin = self.canvas.mapTo(self, QPoint(0, 0))
+        return super().eventFilter(obj, event)
+    
+    def resizeEvent(self, event):
+        """Handle resize events"""
+        super().resizeEvent(event)
+        self._canvas_origin = self.canvas.mapTo(self, QPoint(0, 0))
+    
     def map_to_canvas(self, widget_pos: QPoint) -> QPoint:
         """Map widget coordinates to canvas coordinates"""
-        canvas_pos = self.canvas.mapFrom(self, widget_pos)
-        return canvas_pos - self.pan_offset
+        inv_zoom = self._inv_zoom
+        return QPoint(int((widget_pos.x() - self._canvas_origin.x() - self.pan_offset.x()) * inv_zoom),
+                      int((widget_pos.y() - self._canvas_origin.y() - self.pan_offset.y()) * inv_zoom))
 
 
 class Canvas(QWidget):
     """Inner canvas widget for drawing"""
     
+    # Transparency checkerboard cell size and colours
+    CHECKER_SIZE = 20
+    CHECKER_COLORS = ((200, 200, 200), (255, 255, 255))
+    
+    # (ndim, channels) -> QImage format the buffer can be wrapped as without conversion.
+    # Three-channel images come from OpenCV (BGR); four-channel ones are the RGBA composite.
+    QIMAGE_FORMATS = {
+        (2, 1): QImage.Format_Grayscale8,
+        (3, 3): QImage.Format_BGR888,
+        (3, 4): QImage.Format_RGBA8888,
+    }
+    
     def __init__(self, document: Document):
         super().__init__()
         self.document = document
@@ -150,6 +209,29 @@ class Canvas(QWidget):
         self.zoom = 1.0
         self.pan_offset = QPoint(0, 0)
         
+        # Two-by-two checker cell pattern, tiled natively by Qt as a brush texture.
+        # Plain slicing is enough for four cells and avoids a JIT compile at startup
+        size = self.CHECKER_SIZE
+        color1, color2 = self.CHECKER_COLORS
+        self._checker_tile = np.empty((size * 2, size * 2, 3), dtype=np.uint8)
+        self._checker_tile[:size, :size] = self._checker_tile[size:, size:] = color1
+        self._checker_tile[:size, size:] = self._checker_tile[size:, :size] = color2
+        checker_image = QImage(self._checker_tile.data, size * 2, size * 2,
+                               self._checker_tile.strides[0], QImage.Format_RGB888)
+        self._checker_brush = QBrush(QPixmap.fromImage(checker_image))
+        
+        # Document flattened over the checkerboard, reused until the document is resized.
+        # _display_valid is the part already blended for composite _display_version, so
+        # pans, zooms and preview repaints of an unchanged document just blit it.
+        self._display = None
+        self._display_rgb = None  # RGB-ordered view into _display
+        self._display_image = None
+        self._display_version = -1
+        self._display_valid = QRegion()
+        
+        # Set while a pan repaint is queued, so bursts of pan samples share one update
+        self._pan_pending = False
+        
         # Set widget properties
         self.setMinimumSize(800, 600)
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -165,8 +247,15 @@ class Canvas(QWidget):
         self.update()
     
     def set_pan_offset(self, offset: QPoint):
-        """Set the pan offset"""
+        """Set the pan offset, repainting once per event-loop pass"""
         self.pan_offset = offset
+        if not self._pan_pending:
+            self._pan_pending = True
+            QTimer.singleShot(0, self._flush_pan)
+    
+    def _flush_pan(self):
+        """Repaint with the latest pan offset"""
+        self._pan_pending = False
         self.update()
     
     def update_size(self):
@@ -180,18 +269,23 @@ class Canvas(QWidget):
     def paintEvent(self, event):
         """Paint the canvas"""
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
         
         # Apply zoom and pan transformations
         painter.translate(self.pan_offset)
         painter.scale(self.zoom, self.zoom)
         
-        # Draw checkerboard background
-        self.draw_checkerboard(painter)
+        # Only the exposed part of the document needs redrawing
+        exposed = None
+        if self.document:
+            inverse, _ = painter.transform().inverted()
+            exposed = inverse.mapRect(event.rect()).adjusted(-1, -1, 1, 1)
+            exposed &= QRect(0, 0, self.document.width, self.document.height)
         
-        # Draw document content
+        # Draw document content flattened over the checkerboard
         if self.document:
-            self.draw_document(painter)
+            self.draw_document(painter, exposed)
+        else:
+            self.draw_checkerboard(painter, exposed)
         
         # Draw tool preview
         if self.current_tool:
@@ -199,39 +293,72 @@ class Canvas(QWidget):
             painter.resetTransform()
             painter.translate(self.pan_offset)
             painter.scale(self.zoom, self.zoom)
+            # Antialias the preview lines only; the document blit doesn't need it
+            painter.setRenderHint(QPainter.Antialiasing)
             self.current_tool.draw_preview(painter, self.zoom)
     
-    def draw_checkerboard(self, painter: QPainter):
+    def draw_checkerboard(self, painter: QPainter, rect: QRect = None):
         """Draw checkerboard background"""
-        size = 20
-        color1 = QColor(200, 200, 200)
-        color2 = QColor(255, 255, 255)
+        if rect is None:
+            rect = QRect(0, 0, self.document.width, self.document.height)
         
-        # Calculate visible area
-        visible_rect = painter.viewport()
-        start_x = max(0, visible_rect.x() // size * size)
-        start_y = max(0, visible_rect.y() // size * size)
-        end_x = min(self.document.width, (visible_rect.x() + visible_rect.width()) // size * size + size)
-        end_y = min(self.document.height, (visible_rect.y() + visible_rect.height()) // size * size + size)
-        
-        for y in range(start_y, end_y, size):
-            for x in range(start_x, end_x, size):
-                color = color1 if (x // size + y // size) % 2 == 0 else color2
-                painter.fillRect(x, y, size, size, color)
+        # One native fill; the brush texture repeats across the area
+        painter.fillRect(rect, self._checker_brush)
     
-    def draw_document(self, painter: QPainter):
-        """Draw the document content"""
+    def draw_document(self, painter: QPainter, rect: QRect = None):
+        """Draw the document content, limited to rect (document coordinates) if given"""
         if not self.document:
             return
         
-        # Get the composited image from the document
-        image = self.document.get_composited_image()
+        # Get the composited image from the document, already in display byte order
+        image = self.document.get_composited_image_rgba()
         if image is None:
+            self.draw_checkerboard(painter, rect)
+            return
+        
+        if rect is None:
+            rect = QRect(0, 0, image.shape[1], image.shape[0])
+        if rect.isEmpty():
+            return
+        
+        if image.ndim != 3 or image.shape[2] != 4:
+            # No alpha to blend: draw the checkerboard and the image separately
+            region = image[rect.top():rect.bottom() + 1, rect.left():rect.right() + 1]
+            self.draw_checkerboard(painter, rect)
+            painter.drawPixmap(rect.left(), rect.top(), self.image_to_pixmap(region))
             return
         
-        # Convert to QPixmap and draw
-        pixmap = self.image_to_pixmap(image)
-        painter.drawPixmap(0, 0, pixmap)
+        # Blend over the checkerboard in one pass, writing each display pixel once
+        # instead of filling the checkerboard and then blitting over it
+        height, width = image.shape[:2]
+        if self._display is None or self._display.shape[:2] != (height, width):
+            # Format_RGB32 (B, G, R, 0xFF in memory) is what the raster engine blits
+            # without per-pixel conversion; the padding byte is written once here
+            self._display = np.full((height, width, 4), 255, dtype=np.uint8)
+            self._display_rgb = self._display[..., 2::-1]
+            self._display_image = QImage(self._display.data, width, height,
+                                         self._display.strides[0], QImage.Format_RGB32)
+            self._display_version = -1
+            self._display_valid = QRegion()
+        version = self.document.composite_version
+        if self._display_version != version:
+            changed = self.document.composite_changed_rect
+            if changed is not None and version == self._display_version + 1:
+                # Only a stroke's box changed; the rest of the blended display still holds
+                x0, y0, x1, y1 = changed
+                self._display_valid -= QRegion(x0, y0, x1 - x0, y1 - y0)
+            else:
+                self._display_valid = QRegion()
+            self._display_version = version
+        
+        # Only the exposed pixels not yet blended for this composite need work
+        for stale in QRegion(rect) - self._display_valid:
+            top, bottom = stale.top(), stale.bottom() + 1
+            left, right = stale.left(), stale.right() + 1
+            blend_over_checker(image[top:bottom, left:right], self._display_rgb[top:bottom, left:right],
+                               self.CHECKER_SIZE, *self.CHECKER_COLORS, x0=left, y0=top)
+        self._display_valid += rect
+        painter.drawImage(rect.topLeft(), self._display_image, rect)
     
     def image_to_pixmap(self, image: np.ndarray) -> QPixmap:
         """Convert OpenCV image to QPixmap"""
@@ -241,28 +368,17 @@ class Canvas(QWidget):
             pixmap.fill(QColor(255, 255, 255, 0))
             return pixmap
         
-        # Ensure image is in the right format
-        if len(image.shape) == 3:
-            height, width, channels = image.shape
-            if channels == 3:
-                # Convert BGR to RGB
-                image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-                format = QImage.Format_RGB888
-            elif channels == 4:
-                # Convert BGRA to RGBA
-                image = cv2.cvtColor(image, cv2.COLOR_BGRA2RGBA)
-                format = QImage.Format_RGBA8888
-            else:
-                # Unknown format, create transparent pixmap
-                pixmap = QPixmap(self.document.width, self.document.height)
-                pixmap.fill(QColor(255, 255, 255, 0))
-                return pixmap
-        else:
-            # Grayscale image
-            height, width = image.shape
-            format = QImage.Format_Grayscale8
+        # Look up the matching QImage format
+        height, width = image.shape[:2]
+        format = self.QIMAGE_FORMATS.get((image.ndim, image.shape[2] if image.ndim == 3 else 1))
+        if format is None:
+            # Unknown format, create transparent pixmap
+            pixmap = QPixmap(self.document.width, self.document.height)
+            pixmap.fill(QColor(255, 255, 255, 0))
+            return pixmap
         
-        # Create QImage from numpy array
+        # Create QImage from numpy array (QImage needs row-contiguous pixels)
+        image = np.ascontiguousarray(image)
         qimage = QImage(image.data, width, height, image.strides[0], format)
         
         # Convert to QPixmap
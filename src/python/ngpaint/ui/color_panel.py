@@ -2,19 +2,53 @@
 Color panel for color selection
 """
 
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QSlider, QLabel
-from PySide6.QtCore import Qt, Signal
+from functools import partial
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QPushButton, QSlider, QLabel
+from PySide6.QtCore import Qt, Signal, Slot, QSignalBlocker, QTimer
 from PySide6.QtGui import QColor, QPalette
 
+# Channel value labels, built once instead of formatted on every slider tick
+_BYTE_LABELS = tuple(str(i) for i in range(256))
+
 class ColorPanel(QWidget):
     """Panel for color selection"""
     
     # Signals
     color_changed = Signal(tuple)
     
+    # Preset swatches, four per row
+    PRESET_COLORS = (
+        (255, 0, 0, 255),    # Red
+        (0, 255, 0, 255),    # Green
+        (0, 0, 255, 255),    # Blue
+        (255, 255, 0, 255),  # Yellow
+        (255, 0, 255, 255),  # Magenta
+        (0, 255, 255, 255),  # Cyan
+        (0, 0, 0, 255),      # Black
+        (255, 255, 255, 255) # White
+    )
+    
+    PRESET_STYLE = """
+        QPushButton {
+            border: 1px solid #ccc;
+            border-radius: 3px;
+        }
+        QPushButton:hover {
+            border: 2px solid #0078d4;
+        }
+    """
+    
     def __init__(self):
         super().__init__()
-        self.current_color = (255, 0, 0, 255)  # Red
+        self._color_buf = bytearray((255, 0, 0, 255))  # Red; RGBA, edited in place per tick
+        
+        # Slider ticks only record the new value; the swatch refresh and color_changed
+        # run once per event-loop pass, however many ticks arrived in it
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(0)
+        self._update_timer.timeout.connect(self._flush_color)
         
         self.setup_ui()
         self.update_color_display()
@@ -38,13 +72,17 @@ class ColorPanel(QWidget):
         self.color_display = QPushButton()
         self.color_display.setFixedSize(80, 80)
         self.color_display.setStyleSheet("border: 2px solid #ccc; border-radius: 5px;")
+        self._display_palette = self._fill_swatch(self.color_display, self.current_color)
         layout.addWidget(self.color_display, alignment=Qt.AlignCenter)
         
         # Color sliders
-        self.create_color_slider("Red", 0, 255, 255, self.on_red_changed)
-        self.create_color_slider("Green", 0, 255, 0, self.on_green_changed)
-        self.create_color_slider("Blue", 0, 255, 0, self.on_blue_changed)
-        self.create_color_slider("Alpha", 0, 255, 255, self.on_alpha_changed)
+        self.create_color_slider("Red", 0, 255, 255, partial(self.on_channel_changed, 0))
+        self.create_color_slider("Green", 0, 255, 0, partial(self.on_channel_changed, 1))
+        self.create_color_slider("Blue", 0, 255, 0, partial(self.on_channel_changed, 2))
+        self.create_color_slider("Alpha", 0, 255, 255, partial(self.on_channel_changed, 3))
+        
+        self._channel_sliders = (self.red_slider, self.green_slider, self.blue_slider, self.alpha_slider)
+        self._channel_labels = (self.red_label, self.green_label, self.blue_label, self.alpha_label)
         
         # Preset colors
         self.create_preset_colors()
@@ -81,122 +119,77 @@ class ColorPanel(QWidget):
         preset_title.setStyleSheet("font-weight: bold; font-size: 12px;")
         self.layout().addWidget(preset_title)
         
-        # First row of presets
-        layout1 = QHBoxLayout()
-        preset_colors1 = [
-            (255, 0, 0, 255),    # Red
-            (0, 255, 0, 255),    # Green
-            (0, 0, 255, 255),    # Blue
-            (255, 255, 0, 255),  # Yellow
-        ]
+        # One stylesheet on the container covers every preset button
+        presets = QWidget()
+        presets.setStyleSheet(self.PRESET_STYLE)
+        grid = QGridLayout(presets)
+        grid.setContentsMargins(0, 0, 0, 0)
         
-        for color in preset_colors1:
-            button = QPushButton()
-            button.setFixedSize(25, 25)
-            button.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: rgb({color[0]}, {color[1]}, {color[2]});
-                    border: 1px solid #ccc;
-                    border-radius: 3px;
-                }}
-                QPushButton:hover {{
-                    border: 2px solid #0078d4;
-                }}
-            """)
-            button.clicked.connect(lambda checked, c=color: self.set_color(c))
-            layout1.addWidget(button)
-        
-        self.layout().addLayout(layout1)
-        
-        # Second row of presets
-        layout2 = QHBoxLayout()
-        preset_colors2 = [
-            (255, 0, 255, 255),  # Magenta
-            (0, 255, 255, 255),  # Cyan
-            (0, 0, 0, 255),      # Black
-            (255, 255, 255, 255) # White
-        ]
-        
-        for color in preset_colors2:
+        for i, color in enumerate(self.PRESET_COLORS):
             button = QPushButton()
             button.setFixedSize(25, 25)
-            button.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: rgb({color[0]}, {color[1]}, {color[2]});
-                    border: 1px solid #ccc;
-                    border-radius: 3px;
-                }}
-                QPushButton:hover {{
-                    border: 2px solid #0078d4;
-                }}
-            """)
-            button.clicked.connect(lambda checked, c=color: self.set_color(c))
-            layout2.addWidget(button)
-        
-        self.layout().addLayout(layout2)
-    
-    def on_red_changed(self, value):
-        """Handle red slider change"""
-        self.current_color = (value, self.current_color[1], self.current_color[2], self.current_color[3])
-        self.red_label.setText(str(value))
-        self.update_color_display()
-        self.color_changed.emit(self.current_color)
+            self._fill_swatch(button, color)
+            button.clicked.connect(partial(self._apply_preset, color))
+            grid.addWidget(button, i // 4, i % 4)
+        
+        self.layout().addWidget(presets)
     
-    def on_green_changed(self, value):
-        """Handle green slider change"""
-        self.current_color = (self.current_color[0], value, self.current_color[2], self.current_color[3])
-        self.green_label.setText(str(value))
-        self.update_color_display()
-        self.color_changed.emit(self.current_color)
+    def _apply_preset(self, color: tuple, _checked: bool = False):
+        """Handle a preset button click"""
+        self.set_color(color)
     
-    def on_blue_changed(self, value):
-        """Handle blue slider change"""
-        self.current_color = (self.current_color[0], self.current_color[1], value, self.current_color[3])
-        self.blue_label.setText(str(value))
-        self.update_color_display()
-        self.color_changed.emit(self.current_color)
+    def on_channel_changed(self, index: int, value: int):
+        """Handle a red/green/blue/alpha slider change"""
+        self._color_buf[index] = value
+        self._channel_labels[index].setText(_BYTE_LABELS[value])
+        if not self._update_timer.isActive():
+            self._update_timer.start()
     
-    def on_alpha_changed(self, value):
-        """Handle alpha slider change"""
-        self.current_color = (self.current_color[0], self.current_color[1], self.current_color[2], value)
-        self.alpha_label.setText(str(value))
+    @Slot()
+    def _flush_color(self):
+        """Show and announce the color after a burst of slider changes"""
         self.update_color_display()
         self.color_changed.emit(self.current_color)
     
     def set_color(self, color: tuple):
         """Set the current color"""
-        self.current_color = color
-        
-        # Update sliders
-        self.red_slider.setValue(color[0])
-        self.green_slider.setValue(color[1])
-        self.blue_slider.setValue(color[2])
-        self.alpha_slider.setValue(color[3])
+        # Clamp to the slider range so the swatch, labels and emitted color agree
+        for i, value in enumerate(color[:4]):
+            self._color_buf[i] = min(255, max(0, int(value)))
+        self._update_timer.stop()
         
-        # Update labels
-        self.red_label.setText(str(color[0]))
-        self.green_label.setText(str(color[1]))
-        self.blue_label.setText(str(color[2]))
-        self.alpha_label.setText(str(color[3]))
+        # Update sliders and labels without re-entering on_channel_changed
+        for slider, label, value in zip(self._channel_sliders, self._channel_labels, self._color_buf):
+            with QSignalBlocker(slider):
+                slider.setValue(value)
+            label.setText(_BYTE_LABELS[value])
         
         self.update_color_display()
         self.color_changed.emit(self.current_color)
     
+    @property
+    def current_color(self) -> tuple:
+        """Current RGBA color as a tuple"""
+        return tuple(self._color_buf)
+    
     def get_color(self) -> tuple:
         """Get the current color"""
         return self.current_color
     
     def update_color_display(self):
         """Update the color display button"""
-        r, g, b, a = self.current_color
-        alpha = a / 255.0
-        
-        # Create background with transparency
-        style = f"""
-            QPushButton {{
-                background-color: rgba({r}, {g}, {b}, {alpha});
-                border: 2px solid #ccc;
-                border-radius: 5px;
-            }}
-        """
-        self.color_display.setStyleSheet(style) 
\ No newline at end of file
+        # A palette swap; the border stylesheet is never re-parsed
+        self._display_palette.setColor(QPalette.Window, QColor(*self._color_buf))
+        self.color_display.setPalette(self._display_palette)
+    
+    @staticmethod
+    def _fill_swatch(button: QPushButton, color: tuple) -> QPalette:
+        """Fill a stylesheet-bordered button with color through its palette"""
+        # The stylesheet draws the border only; the background is auto-filled from
+        # the Window role so color changes don't go through the style engine
+        button.setBackgroundRole(QPalette.Window)
+        button.setAutoFillBackground(True)
+        palette = button.palette()
+        palette.setColor(QPalette.Window, QColor(*color))
+        button.setPalette(palette)
+        return palette 
\ No newline at end of file
@@ -7,7 +7,7 @@ from PySide6.QtWidgets import (
     QPushButton, QComboBox, QSpinBox, QDoubleSpinBox,
     QGroupBox, QCheckBox, QScrollArea, QFrame
 )
-from PySide6.QtCore import Qt, Signal, QTimer
+from PySide6.QtCore import Qt, Signal, Slot, QSignalBlocker, QTimer
 from PySide6.QtGui import QFont
 
 
@@ -18,11 +18,25 @@ class FiltersPanel(QWidget):
     
     def __init__(self):
         super().__init__()
+        # The controls are built on first show, not with the main window
+        self._built = False
+    
+    def showEvent(self, event):
+        """Build the controls the first time the panel becomes visible"""
+        self._ensure_built()
+        super().showEvent(event)
+    
+    def _ensure_built(self):
+        """Create the filter controls and connections if not done yet"""
+        if self._built:
+            return
+        self._built = True
         self.setup_ui()
         self.setup_connections()
         
-        # Preview timer for live updates
-        self.preview_timer = QTimer()
+        # Preview timer for live updates; ticks while it is pending don't restart it
+        self._preview_scheduled = False
+        self.preview_timer = QTimer(self)
         self.preview_timer.setSingleShot(True)
         self.preview_timer.timeout.connect(self.apply_preview_filter)
     
@@ -74,17 +88,8 @@ class FiltersPanel(QWidget):
         gaussian_layout.addWidget(gaussian_label)
         
         # Radius slider
-        radius_layout = QHBoxLayout()
-        radius_layout.addWidget(QLabel("Radius:"))
-        self.gaussian_radius = QSlider(Qt.Horizontal)
-        self.gaussian_radius.setRange(1, 50)
-        self.gaussian_radius.setValue(5)
-        radius_layout.addWidget(self.gaussian_radius)
-        self.gaussian_radius_value = QSpinBox()
-        self.gaussian_radius_value.setRange(1, 50)
-        self.gaussian_radius_value.setValue(5)
-        radius_layout.addWidget(self.gaussian_radius_value)
-        gaussian_layout.addLayout(radius_layout)
+        row, self.gaussian_radius, self.gaussian_radius_value = self._slider_row("Radius:", 1, 50, 5)
+        gaussian_layout.addLayout(row)
         
         # Apply button
         self.gaussian_apply = QPushButton("Apply Gaussian Blur")
@@ -107,43 +112,16 @@ class FiltersPanel(QWidget):
         unsharp_layout.addWidget(unsharp_label)
         
         # Radius slider
-        radius_layout = QHBoxLayout()
-        radius_layout.addWidget(QLabel("Radius:"))
-        self.unsharp_radius = QSlider(Qt.Horizontal)
-        self.unsharp_radius.setRange(1, 20)
-        self.unsharp_radius.setValue(3)
-        radius_layout.addWidget(self.unsharp_radius)
-        self.unsharp_radius_value = QSpinBox()
-        self.unsharp_radius_value.setRange(1, 20)
-        self.unsharp_radius_value.setValue(3)
-        radius_layout.addWidget(self.unsharp_radius_value)
-        unsharp_layout.addLayout(radius_layout)
+        row, self.unsharp_radius, self.unsharp_radius_value = self._slider_row("Radius:", 1, 20, 3)
+        unsharp_layout.addLayout(row)
         
         # Amount slider
-        amount_layout = QHBoxLayout()
-        amount_layout.addWidget(QLabel("Amount:"))
-        self.unsharp_amount = QSlider(Qt.Horizontal)
-        self.unsharp_amount.setRange(0, 200)
-        self.unsharp_amount.setValue(100)
-        amount_layout.addWidget(self.unsharp_amount)
-        self.unsharp_amount_value = QSpinBox()
-        self.unsharp_amount_value.setRange(0, 200)
-        self.unsharp_amount_value.setValue(100)
-        amount_layout.addWidget(self.unsharp_amount_value)
-        unsharp_layout.addLayout(amount_layout)
+        row, self.unsharp_amount, self.unsharp_amount_value = self._slider_row("Amount:", 0, 200, 100)
+        unsharp_layout.addLayout(row)
         
         # Threshold slider
-        threshold_layout = QHBoxLayout()
-        threshold_layout.addWidget(QLabel("Threshold:"))
-        self.unsharp_threshold = QSlider(Qt.Horizontal)
-        self.unsharp_threshold.setRange(0, 255)
-        self.unsharp_threshold.setValue(0)
-        threshold_layout.addWidget(self.unsharp_threshold)
-        self.unsharp_threshold_value = QSpinBox()
-        self.unsharp_threshold_value.setRange(0, 255)
-        self.unsharp_threshold_value.setValue(0)
-        threshold_layout.addWidget(self.unsharp_threshold_value)
-        unsharp_layout.addLayout(threshold_layout)
+        row, self.unsharp_threshold, self.unsharp_threshold_value = self._slider_row("Threshold:", 0, 255, 0)
+        unsharp_layout.addLayout(row)
         
         # Apply button
         self.unsharp_apply = QPushButton("Apply Unsharp Mask")
@@ -166,30 +144,12 @@ class FiltersPanel(QWidget):
         bc_layout.addWidget(bc_label)
         
         # Brightness slider
-        brightness_layout = QHBoxLayout()
-        brightness_layout.addWidget(QLabel("Brightness:"))
-        self.brightness_slider = QSlider(Qt.Horizontal)
-        self.brightness_slider.setRange(-100, 100)
-        self.brightness_slider.setValue(0)
-        brightness_layout.addWidget(self.brightness_slider)
-        self.brightness_value = QSpinBox()
-        self.brightness_value.setRange(-100, 100)
-        self.brightness_value.setValue(0)
-        brightness_layout.addWidget(self.brightness_value)
-        bc_layout.addLayout(brightness_layout)
+        row, self.brightness_slider, self.brightness_value = self._slider_row("Brightness:", -100, 100, 0)
+        bc_layout.addLayout(row)
         
         # Contrast slider
-        contrast_layout = QHBoxLayout()
-        contrast_layout.addWidget(QLabel("Contrast:"))
-        self.contrast_slider = QSlider(Qt.Horizontal)
-        self.contrast_slider.setRange(-100, 100)
-        self.contrast_slider.setValue(0)
-        contrast_layout.addWidget(self.contrast_slider)
-        self.contrast_value = QSpinBox()
-        self.contrast_value.setRange(-100, 100)
-        self.contrast_value.setValue(0)
-        contrast_layout.addWidget(self.contrast_value)
-        bc_layout.addLayout(contrast_layout)
+        row, self.contrast_slider, self.contrast_value = self._slider_row("Contrast:", -100, 100, 0)
+        bc_layout.addLayout(row)
         
         # Apply button
         self.bc_apply = QPushButton("Apply Brightness/Contrast")
@@ -220,17 +180,8 @@ class FiltersPanel(QWidget):
         inpaint_layout.addLayout(method_layout)
         
         # Radius slider
-        inpaint_radius_layout = QHBoxLayout()
-        inpaint_radius_layout.addWidget(QLabel("Radius:"))
-        self.inpaint_radius = QSlider(Qt.Horizontal)
-        self.inpaint_radius.setRange(1, 20)
-        self.inpaint_radius.setValue(3)
-        inpaint_radius_layout.addWidget(self.inpaint_radius)
-        self.inpaint_radius_value = QSpinBox()
-        self.inpaint_radius_value.setRange(1, 20)
-        self.inpaint_radius_value.setValue(3)
-        inpaint_radius_layout.addWidget(self.inpaint_radius_value)
-        inpaint_layout.addLayout(inpaint_radius_layout)
+        row, self.inpaint_radius, self.inpaint_radius_value = self._slider_row("Radius:", 1, 20, 3)
+        inpaint_layout.addLayout(row)
         
         # Apply button
         self.inpaint_apply = QPushButton("Apply Inpaint")
@@ -241,53 +192,65 @@ class FiltersPanel(QWidget):
     
     def setup_connections(self):
         """Setup signal connections"""
-        # Connect sliders to spinboxes
-        self.gaussian_radius.valueChanged.connect(self.gaussian_radius_value.setValue)
-        self.gaussian_radius_value.valueChanged.connect(self.gaussian_radius.setValue)
-        
-        self.unsharp_radius.valueChanged.connect(self.unsharp_radius_value.setValue)
-        self.unsharp_radius_value.valueChanged.connect(self.unsharp_radius.setValue)
-        
-        self.unsharp_amount.valueChanged.connect(self.unsharp_amount_value.setValue)
-        self.unsharp_amount_value.valueChanged.connect(self.unsharp_amount.setValue)
-        
-        self.unsharp_threshold.valueChanged.connect(self.unsharp_threshold_value.setValue)
-        self.unsharp_threshold_value.valueChanged.connect(self.unsharp_threshold.setValue)
-        
-        self.brightness_slider.valueChanged.connect(self.brightness_value.setValue)
-        self.brightness_value.valueChanged.connect(self.brightness_slider.setValue)
-        
-        self.contrast_slider.valueChanged.connect(self.contrast_value.setValue)
-        self.contrast_value.valueChanged.connect(self.contrast_slider.setValue)
-        
-        self.inpaint_radius.valueChanged.connect(self.inpaint_radius_value.setValue)
-        self.inpaint_radius_value.valueChanged.connect(self.inpaint_radius.setValue)
-        
-        # Connect apply buttons
+        # Connect apply buttons (slider/spinbox pairs are linked by _slider_row)
         self.gaussian_apply.clicked.connect(self.apply_gaussian_blur)
         self.unsharp_apply.clicked.connect(self.apply_unsharp_mask)
         self.bc_apply.clicked.connect(self.apply_brightness_contrast)
         self.inpaint_apply.clicked.connect(self.apply_inpaint)
-        
-        # Connect sliders to preview timer
-        sliders = [
-            self.gaussian_radius, self.unsharp_radius, self.unsharp_amount,
-            self.unsharp_threshold, self.brightness_slider, self.contrast_slider,
-            self.inpaint_radius
-        ]
-        for slider in sliders:
-            slider.valueChanged.connect(self.start_preview_timer)
     
+    def _slider_row(self, label: str, minimum: int, maximum: int, default: int):
+        """Build a labelled slider + spinbox row whose two controls stay in sync"""
+        row = QHBoxLayout()
+        row.addWidget(QLabel(label))
+        slider = QSlider(Qt.Horizontal)
+        slider.setRange(minimum, maximum)
+        slider.setValue(default)
+        row.addWidget(slider)
+        spinbox = QSpinBox()
+        spinbox.setRange(minimum, maximum)
+        spinbox.setValue(default)
+        row.addWidget(spinbox)
+        
+        # Either control restarts the preview timer
+        self._link(slider, spinbox, self.start_preview_timer)
+        return row, slider, spinbox
+    
+    @staticmethod
+    def _link(slider: QSlider, spinbox: QSpinBox, on_change=None):
+        """Mirror slider and spinbox values without echoing the change back"""
+        def from_slider(value: int):
+            with QSignalBlocker(spinbox):
+                spinbox.setValue(value)
+            if on_change:
+                on_change()
+        
+        def from_spinbox(value: int):
+            with QSignalBlocker(slider):
+                slider.setValue(value)
+            if on_change:
+                on_change()
+        
+        slider.valueChanged.connect(from_slider)
+        spinbox.valueChanged.connect(from_spinbox)
+    
+    @Slot()
     def start_preview_timer(self):
         """Start the preview timer for live updates"""
+        if self._preview_scheduled:
+            return
+        self._preview_scheduled = True
         self.preview_timer.start(300)  # 300ms delay
     
+    @Slot()
     def apply_preview_filter(self):
         """Apply filter for preview (non-destructive)"""
         # This would apply the filter to a preview layer
         # For now, just enable the apply button
-        self.apply_button.setEnabled(True)
+        self._preview_scheduled = False
+        if not self.apply_button.isEnabled():
+            self.apply_button.setEnabled(True)
     
+    @Slot()
     def apply_gaussian_blur(self):
         """Apply Gaussian blur filter"""
         params = {
@@ -295,6 +258,7 @@ class FiltersPanel(QWidget):
         }
         self.filter_applied.emit('gaussian_blur', params)
     
+    @Slot()
     def apply_unsharp_mask(self):
         """Apply unsharp mask filter"""
         params = {
@@ -304,6 +268,7 @@ class FiltersPanel(QWidget):
         }
         self.filter_applied.emit('unsharp_mask', params)
     
+    @Slot()
     def apply_brightness_contrast(self):
         """Apply brightness/contrast adjustment"""
         params = {
@@ -312,6 +277,7 @@ class FiltersPanel(QWidget):
         }
         self.filter_applied.emit('brightness_contrast', params)
     
+    @Slot()
     def apply_inpaint(self):
         """Apply inpaint filter"""
         params = {
@@ -322,6 +288,7 @@ class FiltersPanel(QWidget):
     
     def reset_all_filters(self):
         """Reset all filter controls to default values"""
+        self._ensure_built()
         self.gaussian_radius.setValue(5)
         self.unsharp_radius.setValue(3)
         self.unsharp_amount.setValue(100)
@@ -329,4 +296,8 @@ class FiltersPanel(QWidget):
         self.brightness_slider.setValue(0)
         self.contrast_slider.setValue(0)
         self.inpaint_radius.setValue(3)
-        self.inpaint_method.setCurrentIndex(0) 
\ No newline at end of file
+        self.inpaint_method.setCurrentIndex(0)
+        
+        # Defaults aren't a user edit; drop the preview the resets scheduled
+        self.preview_timer.stop()
+        self._preview_scheduled = False 
\ No newline at end of file
@@ -0,0 +1,34 @@
+"""
+Thread pool worker for blocking document I/O
+"""
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+class WorkerSignals(QObject):
+    """Signals an IOWorker emits back to the GUI thread"""
+    
+    # Signals
+    finished = Signal(object)  # Return value of the wrapped call
+    error = Signal(str)
+    done = Signal()  # Emitted last, after finished or error
+
+
+class IOWorker(QRunnable):
+    """Runs one blocking call (image decode or encode) on a pool thread"""
+    
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = WorkerSignals()
+    
+    def run(self):
+        """Call the wrapped function and report its result or error"""
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+        finally:
+            self.signals.done.emit()
@@ -6,11 +6,14 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QListWidget, 
     QListWidgetItem, QSlider, QLabel, QComboBox, QCheckBox
 )
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QIcon
+from PySide6.QtCore import Qt, Signal, Slot, QSignalBlocker
+from PySide6.QtGui import QIcon, QBrush
 
 from ..core.document import Document
 
+# Opacity slider labels, built once instead of formatted on every tick
+_OPACITY_LABELS = tuple(f"{i}%" for i in range(101))
+
 class LayersPanel(QWidget):
     """Panel for layer management"""
     
@@ -21,6 +24,8 @@ class LayersPanel(QWidget):
         super().__init__()
         self.document = document
         self.layer_items = []
+        self._last_active = -1  # Row currently highlighted as the active layer
+        self._active_layer = None  # Layer the property controls edit
         
         self.setup_ui()
         self.setup_connections()
@@ -130,32 +135,53 @@ class LayersPanel(QWidget):
         self.layer_list.currentRowChanged.connect(self.on_layer_selected)
     
     def update_layers(self):
-        """Update the layer list"""
-        self.layer_list.clear()
-        self.layer_items = []
-        
+        """Update the layer list, touching only rows that changed"""
         if not self.document:
+            self.layer_list.clear()
+            self.layer_items = []
+            self._last_active = -1
+            self._active_layer = None
             return
         
+        self._refresh_active_layer()
+        
         # Get layer names from document
         layer_names = self.document.get_layer_names()
+        active_index = self.document.get_active_layer_index()
         
-        # Create list items
-        for i, name in enumerate(layer_names):
-            item = QListWidgetItem(name)
-            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-            item.setCheckState(Qt.Checked)  # Default to visible
+        with QSignalBlocker(self.layer_list):
+            self.layer_list.setUpdatesEnabled(False)
+            
+            # Grow or shrink the tail to match the layer count
+            while len(self.layer_items) < len(layer_names):
+                item = QListWidgetItem()
+                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+                item.setCheckState(Qt.Checked)  # Default to visible
+                self.layer_list.addItem(item)
+                self.layer_items.append(item)
+            while len(self.layer_items) > len(layer_names):
+                self.layer_list.takeItem(len(self.layer_items) - 1)
+                self.layer_items.pop()
+            
+            for item, name in zip(self.layer_items, layer_names):
+                if item.text() != name:
+                    item.setText(name)
             
             # Highlight active layer
-            if i == self.document.get_active_layer_index():
-                item.setBackground(Qt.lightGray)
+            if active_index != self._last_active:
+                if 0 <= self._last_active < len(self.layer_items):
+                    self.layer_items[self._last_active].setBackground(QBrush())
+                if 0 <= active_index < len(self.layer_items):
+                    self.layer_items[active_index].setBackground(Qt.lightGray)
+                self._last_active = active_index
+            self.layer_list.setCurrentRow(active_index)
             
-            self.layer_list.addItem(item)
-            self.layer_items.append(item)
+            self.layer_list.setUpdatesEnabled(True)
         
         # Update layer properties
         self.update_layer_properties()
     
+    @Slot()
     def add_layer(self):
         """Add a new layer"""
         if self.document:
@@ -163,12 +189,14 @@ class LayersPanel(QWidget):
             if self.document.add_layer(layer_name):
                 self.update_layers()
     
+    @Slot()
     def delete_layer(self):
         """Delete the selected layer"""
         if self.document and self.layer_list.currentRow() >= 0:
             if self.document.delete_active_layer():
                 self.update_layers()
     
+    @Slot()
     def move_layer_up(self):
         """Move the selected layer up"""
         current_row = self.layer_list.currentRow()
@@ -176,6 +204,7 @@ class LayersPanel(QWidget):
             # TODO: Implement layer reordering in document
             pass
     
+    @Slot()
     def move_layer_down(self):
         """Move the selected layer down"""
         current_row = self.layer_list.currentRow()
@@ -183,60 +212,68 @@ class LayersPanel(QWidget):
             # TODO: Implement layer reordering in document
             pass
     
+    @Slot(int)
     def on_layer_selected(self, row: int):
         """Handle layer selection"""
         if row >= 0 and self.document:
             self.document.set_active_layer(row)
+            self._refresh_active_layer()
             self.layer_selected.emit(row)
             self.update_layer_properties()
     
+    def _refresh_active_layer(self):
+        """Look up the active layer once, rather than on every property change"""
+        index = self.document.get_active_layer_index() if self.document else -1
+        layers = getattr(self.document, 'layers', ())
+        self._active_layer = layers[index] if 0 <= index < len(layers) else None
+    
     def update_layer_properties(self):
         """Update layer property controls"""
-        active_index = self.document.get_active_layer_index() if self.document else -1
-        
-        if active_index >= 0 and hasattr(self.document, 'layers') and active_index < len(self.document.layers):
-            layer = self.document.layers[active_index]
-            
-            # Update opacity slider
-            opacity = int(layer.opacity * 100)
-            self.opacity_slider.setValue(opacity)
-            self.opacity_value.setText(f"{opacity}%")
+        layer = self._active_layer
+        if layer is not None:
+            # Update opacity slider; rounded so 0.29 shows as 29%, not 28%
+            opacity = int(round(layer.opacity * 100))
+            with QSignalBlocker(self.opacity_slider):
+                self.opacity_slider.setValue(opacity)
+            self.opacity_value.setText(_OPACITY_LABELS[opacity])
             
             # Update blend mode combo
             blend_mode = layer.blend_mode.capitalize()
             index = self.blend_mode_combo.findText(blend_mode)
             if index >= 0:
-                self.blend_mode_combo.setCurrentIndex(index)
+                with QSignalBlocker(self.blend_mode_combo):
+                    self.blend_mode_combo.setCurrentIndex(index)
             
             # Update visibility checkbox
-            self.visibility_checkbox.setChecked(layer.visible)
+            with QSignalBlocker(self.visibility_checkbox):
+                self.visibility_checkbox.setChecked(layer.visible)
         else:
             # Disable controls if no layer is selected
             self.opacity_slider.setEnabled(False)
             self.blend_mode_combo.setEnabled(False)
             self.visibility_checkbox.setEnabled(False)
     
+    @Slot(int)
     def on_opacity_changed(self, value: int):
         """Handle opacity slider change"""
-        active_index = self.document.get_active_layer_index() if self.document else -1
-        
-        if active_index >= 0 and hasattr(self.document, 'layers') and active_index < len(self.document.layers):
-            layer = self.document.layers[active_index]
-            layer.opacity = value / 100.0
-            self.opacity_value.setText(f"{value}%")
+        layer = self._active_layer
+        if layer is None:
+            return
+        layer.opacity = value / 100.0
+        self.opacity_value.setText(_OPACITY_LABELS[value])
     
+    @Slot(str)
     def on_blend_mode_changed(self, mode: str):
         """Handle blend mode change"""
-        active_index = self.document.get_active_layer_index() if self.document else -1
-        
-        if active_index >= 0 and hasattr(self.document, 'layers') and active_index < len(self.document.layers):
-            layer = self.document.layers[active_index]
-            layer.blend_mode = mode.lower().replace(" ", "_")
+        layer = self._active_layer
+        if layer is None:
+            return
+        layer.blend_mode = mode.lower().replace(" ", "_")
     
+    @Slot(bool)
     def on_visibility_changed(self, visible: bool):
         """Handle visibility checkbox change"""
-        active_index = self.document.get_active_layer_index() if self.document else -1
-        
-        if active_index >= 0 and hasattr(self.document, 'layers') and active_index < len(self.document.layers):
-            layer = self.document.layers[active_index]
-            layer.visible = visible 
\ No newline at end of file
+        layer = self._active_layer
+        if layer is None:
+            return
+        layer.visible = visible 
\ No newline at end of file
@@ -2,13 +2,15 @@
 Main window for Next-Gen Paint application
 """
 
+from functools import partial
+
 from PySide6.QtWidgets import (
     QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QSplitter, 
     QToolBar, QStatusBar, QMenuBar, QMenu, QFileDialog, QMessageBox,
     QDockWidget, QTabWidget, QSlider, QLabel, QComboBox, QSpinBox,
     QDoubleSpinBox, QCheckBox, QPushButton, QGroupBox, QFormLayout
 )
-from PySide6.QtCore import Qt, QTimer, Signal, QSize, QPoint
+from PySide6.QtCore import Qt, QTimer, Signal, QSize, QPoint, QThreadPool
 from PySide6.QtGui import QIcon, QAction, QKeySequence, QPixmap, QPainter, QColor
 
 from .canvas_widget import CanvasWidget
@@ -17,26 +19,50 @@ from .tools_panel import ToolsPanel
 from .properties_panel import PropertiesPanel
 from .color_panel import ColorPanel
 from .filters_panel import FiltersPanel
+from .io_worker import IOWorker
 from ..core.document import Document
 from ..core.tools import ToolManager
 from ..core.settings import Settings
 
+# Shortcuts without a standard key binding, parsed once at import
+_KS_SAVE_AS = QKeySequence("Ctrl+Shift+S")
+_KS_NEW_LAYER = QKeySequence("Ctrl+Shift+N")
+_KS_DELETE = QKeySequence("Delete")
+
 class MainWindow(QMainWindow):
     """Main application window"""
     
+    # Deferred refresh targets, combined as bit flags
+    REFRESH_CANVAS = 1
+    REFRESH_LAYERS = 2
+    
     def __init__(self):
         super().__init__()
         self.document = Document()
         self.tool_manager = ToolManager()
         self.settings = Settings()
         
+        # Canvas and layer list refreshes requested in one event-loop pass run once
+        self._refresh_flags = 0
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(0)
+        self._refresh_timer.timeout.connect(self._do_refresh)
+        self._pending_history_steps = 0  # Net queued undos (< 0) or redos (> 0)
+        
+        # Image decode/encode runs on the pool; results come back by queued signal
+        self.threadpool = QThreadPool.globalInstance()
+        self._io_workers = set()
+        
         self.setup_ui()
         self.setup_menus()
         self.setup_toolbars()
         self.setup_status_bar()
-        self.setup_docks()
         self.setup_connections()
         
+        # Dock widgets are only created once the window is first shown
+        self._docks_built = False
+        
         # Set window properties
         self.setWindowTitle("Next-Gen Paint")
         self.setMinimumSize(1200, 800)
@@ -111,23 +137,23 @@ class MainWindow(QMainWindow):
         # File menu
         file_menu = menubar.addMenu("&File")
         
-        new_action = QAction("&New", self)
-        new_action.setShortcut(QKeySequence.New)
-        new_action.triggered.connect(self.new_document)
-        file_menu.addAction(new_action)
+        self.new_action = QAction("&New", self)
+        self.new_action.setShortcut(QKeySequence.New)
+        self.new_action.triggered.connect(self.new_document)
+        file_menu.addAction(self.new_action)
         
-        open_action = QAction("&Open...", self)
-        open_action.setShortcut(QKeySequence.Open)
-        open_action.triggered.connect(self.open_document)
-        file_menu.addAction(open_action)
+        self.open_action = QAction("&Open...", self)
+        self.open_action.setShortcut(QKeySequence.Open)
+        self.open_action.triggered.connect(self.open_document)
+        file_menu.addAction(self.open_action)
         
-        save_action = QAction("&Save", self)
-        save_action.setShortcut(QKeySequence.Save)
-        save_action.triggered.connect(self.save_document)
-        file_menu.addAction(save_action)
+        self.save_action = QAction("&Save", self)
+        self.save_action.setShortcut(QKeySequence.Save)
+        self.save_action.triggered.connect(self.save_document)
+        file_menu.addAction(self.save_action)
         
         save_as_action = QAction("Save &As...", self)
-        save_as_action.setShortcut(QKeySequence("Ctrl+Shift+S"))
+        save_as_action.setShortcut(_KS_SAVE_AS)
         save_as_action.triggered.connect(self.save_document_as)
         file_menu.addAction(save_as_action)
         
@@ -147,15 +173,17 @@ class MainWindow(QMainWindow):
         # Edit menu
         edit_menu = menubar.addMenu("&Edit")
         
-        undo_action = QAction("&Undo", self)
-        undo_action.setShortcut(QKeySequence.Undo)
-        undo_action.triggered.connect(self.undo)
-        edit_menu.addAction(undo_action)
+        # Undo/redo stay routed through MainWindow rather than straight to the
+        # document: that is where key-repeat bursts are batched into one refresh
+        self.undo_action = QAction("&Undo", self)
+        self.undo_action.setShortcut(QKeySequence.Undo)
+        self.undo_action.triggered.connect(self.undo)
+        edit_menu.addAction(self.undo_action)
         
-        redo_action = QAction("&Redo", self)
-        redo_action.setShortcut(QKeySequence.Redo)
-        redo_action.triggered.connect(self.redo)
-        edit_menu.addAction(redo_action)
+        self.redo_action = QAction("&Redo", self)
+        self.redo_action.setShortcut(QKeySequence.Redo)
+        self.redo_action.triggered.connect(self.redo)
+        edit_menu.addAction(self.redo_action)
         
         edit_menu.addSeparator()
         
@@ -177,13 +205,13 @@ class MainWindow(QMainWindow):
         # Layer menu
         layer_menu = menubar.addMenu("&Layer")
         
-        new_layer_action = QAction("&New Layer", self)
-        new_layer_action.setShortcut(QKeySequence("Ctrl+Shift+N"))
-        new_layer_action.triggered.connect(self.new_layer)
-        layer_menu.addAction(new_layer_action)
+        self.new_layer_action = QAction("&New Layer", self)
+        self.new_layer_action.setShortcut(_KS_NEW_LAYER)
+        self.new_layer_action.triggered.connect(self.new_layer)
+        layer_menu.addAction(self.new_layer_action)
         
         delete_layer_action = QAction("&Delete Layer", self)
-        delete_layer_action.setShortcut(QKeySequence("Delete"))
+        delete_layer_action.setShortcut(_KS_DELETE)
         delete_layer_action.triggered.connect(self.delete_layer)
         layer_menu.addAction(delete_layer_action)
         
@@ -212,20 +240,20 @@ class MainWindow(QMainWindow):
         main_toolbar.setMovable(False)
         
         # File actions
-        main_toolbar.addAction(self.findChild(QAction, "New"))
-        main_toolbar.addAction(self.findChild(QAction, "Open"))
-        main_toolbar.addAction(self.findChild(QAction, "Save"))
+        main_toolbar.addAction(self.new_action)
+        main_toolbar.addAction(self.open_action)
+        main_toolbar.addAction(self.save_action)
         
         main_toolbar.addSeparator()
         
         # Edit actions
-        main_toolbar.addAction(self.findChild(QAction, "Undo"))
-        main_toolbar.addAction(self.findChild(QAction, "Redo"))
+        main_toolbar.addAction(self.undo_action)
+        main_toolbar.addAction(self.redo_action)
         
         main_toolbar.addSeparator()
         
         # Layer actions
-        main_toolbar.addAction(self.findChild(QAction, "New Layer"))
+        main_toolbar.addAction(self.new_layer_action)
     
     def setup_status_bar(self):
         """Setup the status bar"""
@@ -241,135 +269,204 @@ class MainWindow(QMainWindow):
         
         self.status_bar.showMessage("Ready")
     
+    def showEvent(self, event):
+        """Create the dock widgets the first time the window becomes visible"""
+        if not self._docks_built:
+            self._docks_built = True
+            self.setup_docks()
+        super().showEvent(event)
+    
     def setup_docks(self):
         """Setup dockable widgets"""
         # History dock
-        history_dock = QDockWidget("History", self)
-        history_dock.setAllowedAreas(Qt.LeftDockWidgetArea | Qt.RightDockWidgetArea)
-        self.addDockWidget(Qt.RightDockWidgetArea, history_dock)
+        self.history_dock = QDockWidget("History", self)
+        self.history_dock.setAllowedAreas(Qt.LeftDockWidgetArea | Qt.RightDockWidgetArea)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.history_dock)
         
         # Navigator dock
-        navigator_dock = QDockWidget("Navigator", self)
-        navigator_dock.setAllowedAreas(Qt.LeftDockWidgetArea | Qt.RightDockWidgetArea)
-        self.addDockWidget(Qt.RightDockWidgetArea, navigator_dock)
+        self.navigator_dock = QDockWidget("Navigator", self)
+        self.navigator_dock.setAllowedAreas(Qt.LeftDockWidgetArea | Qt.RightDockWidgetArea)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.navigator_dock)
     
     def setup_connections(self):
         """Setup signal connections"""
-        # Connect tool manager to canvas and document
-        self.tool_manager.tool_changed.connect(self.canvas_widget.set_tool)
+        # Connect tool manager to canvas, properties panel and document
+        self.tool_manager.tool_changed.connect(self._on_tool_changed)
+        self.tool_manager.stroke_flushed.connect(self.canvas_widget.update_canvas_rect)
         self.tool_manager.set_document(self.document)
         
         # Connect color panel to tool manager
         self.color_panel.color_changed.connect(self.tool_manager.set_color)
         
         # Connect properties panel to tool manager
-        self.properties_panel.property_changed.connect(self.tool_manager.set_property)
+        for value_type in (int, float, str):
+            self.properties_panel.property_changed[str, value_type].connect(self.tool_manager.set_property)
         
-        # Connect tool manager to properties panel
-        self.tool_manager.tool_changed.connect(self.properties_panel.set_tool)
+        # The initial tool was chosen before these connections existed
+        self._on_tool_changed(self.tool_manager.get_current_tool())
         
         # Connect layers panel to document
         self.layers_panel.layer_selected.connect(self.document.set_active_layer)
         
         # Connect filters panel to document
         self.filters_panel.filter_applied.connect(self.document.apply_filter)
-        
-        # Connect canvas mouse events to tool manager
-        self.canvas_widget.mouse_pressed.connect(self._handle_mouse_press)
-        self.canvas_widget.mouse_moved.connect(self._handle_mouse_move)
-        self.canvas_widget.mouse_released.connect(self._handle_mouse_release)
     
-    def _handle_mouse_press(self, pos: QPoint):
-        """Handle mouse press from canvas"""
-        if self.tool_manager.get_current_tool():
-            self.tool_manager.get_current_tool().mouse_press(pos)
-            self.canvas_widget.update_canvas()
+    def _on_tool_changed(self, tool):
+        """Hand the new current tool to the canvas and the properties panel"""
+        self.canvas_widget.set_tool(tool)
+        self.properties_panel.set_tool(tool)
     
-    def _handle_mouse_move(self, pos: QPoint):
-        """Handle mouse move from canvas"""
-        if self.tool_manager.get_current_tool():
-            self.tool_manager.get_current_tool().mouse_move(pos)
-            self.canvas_widget.update_canvas()
+    def _schedule_refresh(self, flags: int):
+        """Queue a canvas and/or layer list refresh for the next event-loop pass"""
+        self._refresh_flags |= flags
+        if not self._refresh_timer.isActive():
+            self._refresh_timer.start()
     
-    def _handle_mouse_release(self, pos: QPoint):
-        """Handle mouse release from canvas"""
-        if self.tool_manager.get_current_tool():
-            self.tool_manager.get_current_tool().mouse_release(pos)
+    def _do_refresh(self):
+        """Run the queued refreshes, layer list first and canvas repaint last"""
+        if self._pending_history_steps:
+            self._apply_history_steps()
+        flags, self._refresh_flags = self._refresh_flags, 0
+        if flags & self.REFRESH_LAYERS:
+            self.layers_panel.update_layers()
+        if flags & self.REFRESH_CANVAS:
             self.canvas_widget.update_canvas()
     
     def new_document(self):
         """Create a new document"""
         self.document.new_document(1920, 1080)
-        self.canvas_widget.update_canvas()
-        self.layers_panel.update_layers()
+        self._schedule_refresh(self.REFRESH_CANVAS | self.REFRESH_LAYERS)
         self.status_bar.showMessage("New document created")
     
+    def _show_file_dialog(self, caption: str, name_filter: str, on_selected, save: bool = False):
+        """Show a window-modal file dialog without blocking in a nested event loop"""
+        dialog = QFileDialog(self, caption, "", name_filter)
+        if save:
+            dialog.setAcceptMode(QFileDialog.AcceptSave)
+        else:
+            dialog.setFileMode(QFileDialog.ExistingFile)
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        dialog.fileSelected.connect(on_selected)
+        dialog.open()
+    
     def open_document(self):
         """Open an existing document"""
-        file_path, _ = QFileDialog.getOpenFileName(
-            self, "Open Document", "", 
-            "Image Files (*.png *.jpg *.jpeg *.bmp *.tiff);;All Files (*)"
+        self._show_file_dialog(
+            "Open Document",
+            "Image Files (*.png *.jpg *.jpeg *.bmp *.tiff);;All Files (*)",
+            self._open_file
         )
-        
+    
+    def _run_io(self, on_finished, error_message: str, fn, *args):
+        """Run a blocking document I/O call on the thread pool
+        
+        on_finished receives the call's result back on the GUI thread; failures
+        are reported in a message box prefixed with error_message.
+        """
+        worker = IOWorker(fn, *args)
+        worker.signals.finished.connect(on_finished)
+        worker.signals.error.connect(partial(self._on_io_error, error_message))
+        # Keep the worker and its signals alive until the result has been delivered
+        self._io_workers.add(worker)
+        worker.signals.done.connect(partial(self._io_workers.discard, worker))
+        self.threadpool.start(worker)
+    
+    def _on_io_error(self, error_message: str, error: str):
+        """Report a failed background I/O call"""
+        QMessageBox.critical(self, "Error", f"{error_message}: {error}")
+    
+    def _open_file(self, file_path: str):
+        """Decode the file chosen in the open dialog off the GUI thread"""
         if file_path:
-            try:
-                self.document.open_document(file_path)
-                self.canvas_widget.update_canvas()
-                self.layers_panel.update_layers()
-                self.status_bar.showMessage(f"Opened {file_path}")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to open document: {e}")
+            self.status_bar.showMessage(f"Opening {file_path}...")
+            self._run_io(partial(self._on_open_done, file_path), "Failed to open document",
+                         Document.read_image_file, file_path)
+    
+    def _on_open_done(self, file_path: str, image):
+        """Load a decoded image into the document"""
+        self.document.load_image(image, file_path)
+        self._schedule_refresh(self.REFRESH_CANVAS | self.REFRESH_LAYERS)
+        self.status_bar.showMessage(f"Opened {file_path}")
+    
+    def _write_file(self, file_path: str, error_message: str, done_message: str):
+        """Encode a snapshot of the composited image to file_path off the GUI thread"""
+        image = self.document.get_composited_image()
+        if image is None:
+            QMessageBox.critical(self, "Error", f"{error_message}: No image data to save")
+            return
+        
+        # Strokes may update the composite while the worker is still encoding it
+        self._run_io(partial(self._on_write_done, file_path, done_message), error_message,
+                     Document.write_image_file, file_path, image.copy())
+    
+    def _on_write_done(self, file_path: str, done_message: str, _result=None):
+        """Record the path of a finished save or export"""
+        self.document.file_path = file_path
+        self.status_bar.showMessage(done_message)
     
     def save_document(self):
         """Save the current document"""
         if not self.document.file_path:
             return self.save_document_as()
         
-        try:
-            self.document.save_document()
-            self.status_bar.showMessage(f"Saved {self.document.file_path}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to save document: {e}")
+        file_path = self.document.file_path
+        self._write_file(file_path, "Failed to save document", f"Saved {file_path}")
     
     def save_document_as(self):
         """Save the document with a new name"""
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "Save Document", "", 
-            "PNG Files (*.png);;JPEG Files (*.jpg);;All Files (*)"
+        self._show_file_dialog(
+            "Save Document",
+            "PNG Files (*.png);;JPEG Files (*.jpg);;All Files (*)",
+            self._save_file_as, save=True
         )
-        
+    
+    def _save_file_as(self, file_path: str):
+        """Save the document to the path chosen in the save dialog"""
         if file_path:
-            try:
-                self.document.save_document_as(file_path)
-                self.status_bar.showMessage(f"Saved {file_path}")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to save document: {e}")
+            self._write_file(file_path, "Failed to save document", f"Saved {file_path}")
     
     def export_document(self):
         """Export the document"""
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "Export Document", "", 
-            "PNG Files (*.png);;JPEG Files (*.jpg);;All Files (*)"
+        self._show_file_dialog(
+            "Export Document",
+            "PNG Files (*.png);;JPEG Files (*.jpg);;All Files (*)",
+            self._export_file, save=True
         )
-        
+    
+    def _export_file(self, file_path: str):
+        """Export the document to the path chosen in the export dialog"""
         if file_path:
-            try:
-                self.document.export_document(file_path)
-                self.status_bar.showMessage(f"Exported {file_path}")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to export document: {e}")
+            self._write_file(file_path, "Failed to export document", f"Exported {file_path}")
     
     def undo(self):
         """Undo the last action"""
-        if self.document.undo():
-            self.canvas_widget.update_canvas()
-            self.status_bar.showMessage("Undo")
+        self._queue_history_step(-1)
     
     def redo(self):
         """Redo the last undone action"""
-        if self.document.redo():
-            self.canvas_widget.update_canvas()
-            self.status_bar.showMessage("Redo")
+        self._queue_history_step(1)
+    
+    def _queue_history_step(self, step: int):
+        """Queue an undo (-1) or redo (+1) so key-repeat bursts share one repaint"""
+        if self._pending_history_steps * step < 0:
+            # Direction changed; apply the earlier steps first to keep their order
+            self._apply_history_steps()
+        self._pending_history_steps += step
+        self._schedule_refresh(0)
+    
+    def _apply_history_steps(self):
+        """Run the queued undo or redo steps back to back"""
+        steps, self._pending_history_steps = self._pending_history_steps, 0
+        step = self.document.undo if steps < 0 else self.document.redo
+        applied = 0
+        for _ in range(abs(steps)):
+            if not step():
+                break
+            applied += 1
+        
+        if applied:
+            self._refresh_flags |= self.REFRESH_CANVAS
+            self.status_bar.showMessage("Undo" if steps < 0 else "Redo")
     
     def cut(self):
         """Cut selection to clipboard"""
@@ -389,14 +486,13 @@ class MainWindow(QMainWindow):
     def new_layer(self):
         """Create a new layer"""
         self.document.add_layer("New Layer")
-        self.layers_panel.update_layers()
+        self._schedule_refresh(self.REFRESH_LAYERS)
         self.status_bar.showMessage("New layer created")
     
     def delete_layer(self):
         """Delete the current layer"""
         if self.document.delete_active_layer():
-            self.layers_panel.update_layers()
-            self.canvas_widget.update_canvas()
+            self._schedule_refresh(self.REFRESH_CANVAS | self.REFRESH_LAYERS)
             self.status_bar.showMessage("Layer deleted")
     
     def apply_blur(self):
@@ -421,4 +517,6 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """Handle window close event"""
         # TODO: Check for unsaved changes
+        # Let pending saves finish writing before the window goes away
+        self.threadpool.waitForDone()
         event.accept() 
\ No newline at end of file
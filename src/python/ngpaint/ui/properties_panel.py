@@ -2,17 +2,45 @@
 Properties panel for tool properties
 """
 
+from functools import partial
+
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QSlider, QLabel, 
-    QDoubleSpinBox, QSpinBox, QComboBox, QGroupBox, QFormLayout
+    QDoubleSpinBox, QSpinBox, QComboBox, QGroupBox, QFormLayout, QStackedWidget
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QSignalBlocker
 
 class PropertiesPanel(QWidget):
     """Panel for tool properties"""
     
-    # Signals
-    property_changed = Signal(str, object)
+    # Signals; typed overloads let int and float values cross without object boxing
+    property_changed = Signal((str, int), (str, float), (str, str))
+    
+    # Controls per tool kind. Numeric rows are (property, label, minimum, maximum,
+    # step, default): int ranges get a QSpinBox, float ones a QDoubleSpinBox with
+    # a slider in hundredths. Choice rows are (property, label, options).
+    _SCHEMAS = {
+        'brush': (
+            ('size', "Size:", 1, 100, 1, 10),
+            ('opacity', "Opacity:", 0.0, 1.0, 0.1, 1.0),
+            ('hardness', "Hardness:", 0.0, 1.0, 0.1, 0.5),
+            ('spacing', "Spacing:", 0.01, 1.0, 0.01, 0.25),
+        ),
+        'eraser': (
+            ('size', "Size:", 1, 100, 1, 20),
+            ('opacity', "Opacity:", 0.0, 1.0, 0.1, 1.0),
+            ('hardness', "Hardness:", 0.0, 1.0, 0.1, 0.5),
+        ),
+        'smudge': (
+            ('size', "Size:", 1, 100, 1, 15),
+            ('strength', "Strength:", 0.0, 1.0, 0.1, 0.5),
+            ('opacity', "Opacity:", 0.0, 1.0, 0.1, 0.8),
+        ),
+        'selection': (
+            ('feather', "Feather:", 0, 50, 1, 0),
+            ('mode', "Mode:", ("Replace", "Add", "Subtract", "Intersect")),
+        ),
+    }
     
     def __init__(self):
         super().__init__()
@@ -35,236 +63,82 @@ class PropertiesPanel(QWidget):
         title.setStyleSheet("font-weight: bold; font-size: 14px;")
         layout.addWidget(title)
         
-        # Tool properties group
+        # Tool properties group; each tool's page is built once and switched
+        # in place rather than torn down and rebuilt on every tool change
         self.tool_group = QGroupBox("Tool Properties")
-        self.tool_layout = QFormLayout(self.tool_group)
+        group_layout = QVBoxLayout(self.tool_group)
+        self.stack = QStackedWidget()
+        group_layout.addWidget(self.stack)
         layout.addWidget(self.tool_group)
         
-        # Create default properties
-        self.create_brush_properties()
+        self._pages = {kind: self._build_page(schema) for kind, schema in self._SCHEMAS.items()}
+        for page in self._pages.values():
+            self.stack.addWidget(page)
+        self.stack.setCurrentWidget(self._pages['brush'])
         
         layout.addStretch()
     
-    def create_brush_properties(self):
-        """Create brush tool properties"""
-        # Size slider
-        self.size_slider = QSlider(Qt.Horizontal)
-        self.size_slider.setRange(1, 100)
-        self.size_slider.setValue(10)
-        self.size_slider.valueChanged.connect(lambda v: self.on_property_changed('size', v))
-        
-        self.size_spinbox = QSpinBox()
-        self.size_spinbox.setRange(1, 100)
-        self.size_spinbox.setValue(10)
-        self.size_spinbox.valueChanged.connect(lambda v: self.on_property_changed('size', v))
-        
-        size_layout = QHBoxLayout()
-        size_layout.addWidget(self.size_slider)
-        size_layout.addWidget(self.size_spinbox)
-        
-        self.tool_layout.addRow("Size:", size_layout)
-        
-        # Opacity slider
-        self.opacity_slider = QSlider(Qt.Horizontal)
-        self.opacity_slider.setRange(0, 100)
-        self.opacity_slider.setValue(100)
-        self.opacity_slider.valueChanged.connect(lambda v: self.on_property_changed('opacity', v / 100.0))
-        
-        self.opacity_spinbox = QDoubleSpinBox()
-        self.opacity_spinbox.setRange(0.0, 1.0)
-        self.opacity_spinbox.setSingleStep(0.1)
-        self.opacity_spinbox.setValue(1.0)
-        self.opacity_spinbox.valueChanged.connect(lambda v: self.on_property_changed('opacity', v))
-        
-        opacity_layout = QHBoxLayout()
-        opacity_layout.addWidget(self.opacity_slider)
-        opacity_layout.addWidget(self.opacity_spinbox)
-        
-        self.tool_layout.addRow("Opacity:", opacity_layout)
-        
-        # Hardness slider
-        self.hardness_slider = QSlider(Qt.Horizontal)
-        self.hardness_slider.setRange(0, 100)
-        self.hardness_slider.setValue(50)
-        self.hardness_slider.valueChanged.connect(lambda v: self.on_property_changed('hardness', v / 100.0))
-        
-        self.hardness_spinbox = QDoubleSpinBox()
-        self.hardness_spinbox.setRange(0.0, 1.0)
-        self.hardness_spinbox.setSingleStep(0.1)
-        self.hardness_spinbox.setValue(0.5)
-        self.hardness_spinbox.valueChanged.connect(lambda v: self.on_property_changed('hardness', v))
-        
-        hardness_layout = QHBoxLayout()
-        hardness_layout.addWidget(self.hardness_slider)
-        hardness_layout.addWidget(self.hardness_spinbox)
-        
-        self.tool_layout.addRow("Hardness:", hardness_layout)
-        
-        # Spacing slider
-        self.spacing_slider = QSlider(Qt.Horizontal)
-        self.spacing_slider.setRange(1, 100)
-        self.spacing_slider.setValue(25)
-        self.spacing_slider.valueChanged.connect(lambda v: self.on_property_changed('spacing', v / 100.0))
-        
-        self.spacing_spinbox = QDoubleSpinBox()
-        self.spacing_spinbox.setRange(0.01, 1.0)
-        self.spacing_spinbox.setSingleStep(0.01)
-        self.spacing_spinbox.setValue(0.25)
-        self.spacing_spinbox.valueChanged.connect(lambda v: self.on_property_changed('spacing', v))
-        
-        spacing_layout = QHBoxLayout()
-        spacing_layout.addWidget(self.spacing_slider)
-        spacing_layout.addWidget(self.spacing_spinbox)
-        
-        self.tool_layout.addRow("Spacing:", spacing_layout)
+    def _build_page(self, schema) -> QWidget:
+        """Build one tool's properties page from its schema"""
+        page = QWidget()
+        form = QFormLayout(page)
+        page.pairs = []  # (property, slider, spinbox, slider scale, default)
+        page.choices = []  # (property, combo box)
+        
+        for row in schema:
+            if len(row) == 3:
+                # Choice row
+                name, label, options = row
+                combo = QComboBox()
+                combo.addItems(options)
+                combo.currentTextChanged.connect(partial(self._on_choice_changed, name))
+                page.choices.append((name, combo))
+                form.addRow(label, combo)
+                continue
+            
+            name, label, minimum, maximum, step, default = row
+            scale = 1 if isinstance(default, int) else 100
+            slider = QSlider(Qt.Horizontal)
+            slider.setRange(int(round(minimum * scale)), int(round(maximum * scale)))
+            slider.setValue(int(round(default * scale)))
+            
+            spinbox = QSpinBox() if scale == 1 else QDoubleSpinBox()
+            spinbox.setRange(minimum, maximum)
+            spinbox.setSingleStep(step)
+            spinbox.setValue(default)
+            
+            row_layout = QHBoxLayout()
+            row_layout.addWidget(slider)
+            row_layout.addWidget(spinbox)
+            self._link_pair(slider, spinbox, name, scale)
+            page.pairs.append((name, slider, spinbox, scale, default))
+            
+            form.addRow(label, row_layout)
+        
+        return page
     
-    def create_eraser_properties(self):
-        """Create eraser tool properties"""
-        # Clear existing properties
-        while self.tool_layout.rowCount() > 0:
-            self.tool_layout.removeRow(0)
-        
-        # Size slider
-        self.size_slider = QSlider(Qt.Horizontal)
-        self.size_slider.setRange(1, 100)
-        self.size_slider.setValue(20)
-        self.size_slider.valueChanged.connect(lambda v: self.on_property_changed('size', v))
-        
-        self.size_spinbox = QSpinBox()
-        self.size_spinbox.setRange(1, 100)
-        self.size_spinbox.setValue(20)
-        self.size_spinbox.valueChanged.connect(lambda v: self.on_property_changed('size', v))
-        
-        size_layout = QHBoxLayout()
-        size_layout.addWidget(self.size_slider)
-        size_layout.addWidget(self.size_spinbox)
-        
-        self.tool_layout.addRow("Size:", size_layout)
-        
-        # Opacity slider
-        self.opacity_slider = QSlider(Qt.Horizontal)
-        self.opacity_slider.setRange(0, 100)
-        self.opacity_slider.setValue(100)
-        self.opacity_slider.valueChanged.connect(lambda v: self.on_property_changed('opacity', v / 100.0))
-        
-        self.opacity_spinbox = QDoubleSpinBox()
-        self.opacity_spinbox.setRange(0.0, 1.0)
-        self.opacity_spinbox.setSingleStep(0.1)
-        self.opacity_spinbox.setValue(1.0)
-        self.opacity_spinbox.valueChanged.connect(lambda v: self.on_property_changed('opacity', v))
-        
-        opacity_layout = QHBoxLayout()
-        opacity_layout.addWidget(self.opacity_slider)
-        opacity_layout.addWidget(self.opacity_spinbox)
-        
-        self.tool_layout.addRow("Opacity:", opacity_layout)
-        
-        # Hardness slider
-        self.hardness_slider = QSlider(Qt.Horizontal)
-        self.hardness_slider.setRange(0, 100)
-        self.hardness_slider.setValue(50)
-        self.hardness_slider.valueChanged.connect(lambda v: self.on_property_changed('hardness', v / 100.0))
-        
-        self.hardness_spinbox = QDoubleSpinBox()
-        self.hardness_spinbox.setRange(0.0, 1.0)
-        self.hardness_spinbox.setSingleStep(0.1)
-        self.hardness_spinbox.setValue(0.5)
-        self.hardness_spinbox.valueChanged.connect(lambda v: self.on_property_changed('hardness', v))
-        
-        hardness_layout = QHBoxLayout()
-        hardness_layout.addWidget(self.hardness_slider)
-        hardness_layout.addWidget(self.hardness_spinbox)
-        
-        self.tool_layout.addRow("Hardness:", hardness_layout)
+    def _link_pair(self, slider: QSlider, spinbox, name: str, scale: int):
+        """Mirror a slider/spinbox pair and report each user change exactly once"""
+        slider.valueChanged.connect(partial(self._on_slider_changed, spinbox, name, scale))
+        spinbox.valueChanged.connect(partial(self._on_spinbox_changed, slider, name, scale))
     
-    def create_smudge_properties(self):
-        """Create smudge tool properties"""
-        # Clear existing properties
-        while self.tool_layout.rowCount() > 0:
-            self.tool_layout.removeRow(0)
-        
-        # Size slider
-        self.size_slider = QSlider(Qt.Horizontal)
-        self.size_slider.setRange(1, 100)
-        self.size_slider.setValue(15)
-        self.size_slider.valueChanged.connect(lambda v: self.on_property_changed('size', v))
-        
-        self.size_spinbox = QSpinBox()
-        self.size_spinbox.setRange(1, 100)
-        self.size_spinbox.setValue(15)
-        self.size_spinbox.valueChanged.connect(lambda v: self.on_property_changed('size', v))
-        
-        size_layout = QHBoxLayout()
-        size_layout.addWidget(self.size_slider)
-        size_layout.addWidget(self.size_spinbox)
-        
-        self.tool_layout.addRow("Size:", size_layout)
-        
-        # Strength slider
-        self.strength_slider = QSlider(Qt.Horizontal)
-        self.strength_slider.setRange(0, 100)
-        self.strength_slider.setValue(50)
-        self.strength_slider.valueChanged.connect(lambda v: self.on_property_changed('strength', v / 100.0))
-        
-        self.strength_spinbox = QDoubleSpinBox()
-        self.strength_spinbox.setRange(0.0, 1.0)
-        self.strength_spinbox.setSingleStep(0.1)
-        self.strength_spinbox.setValue(0.5)
-        self.strength_spinbox.valueChanged.connect(lambda v: self.on_property_changed('strength', v))
-        
-        strength_layout = QHBoxLayout()
-        strength_layout.addWidget(self.strength_slider)
-        strength_layout.addWidget(self.strength_spinbox)
-        
-        self.tool_layout.addRow("Strength:", strength_layout)
-        
-        # Opacity slider
-        self.opacity_slider = QSlider(Qt.Horizontal)
-        self.opacity_slider.setRange(0, 100)
-        self.opacity_slider.setValue(80)
-        self.opacity_slider.valueChanged.connect(lambda v: self.on_property_changed('opacity', v / 100.0))
-        
-        self.opacity_spinbox = QDoubleSpinBox()
-        self.opacity_spinbox.setRange(0.0, 1.0)
-        self.opacity_spinbox.setSingleStep(0.1)
-        self.opacity_spinbox.setValue(0.8)
-        self.opacity_spinbox.valueChanged.connect(lambda v: self.on_property_changed('opacity', v))
-        
-        opacity_layout = QHBoxLayout()
-        opacity_layout.addWidget(self.opacity_slider)
-        opacity_layout.addWidget(self.opacity_spinbox)
-        
-        self.tool_layout.addRow("Opacity:", opacity_layout)
+    def _on_slider_changed(self, spinbox, name: str, scale: int, value: int):
+        """Copy a slider move into its spinbox and apply it to the tool"""
+        if scale != 1:
+            value /= scale
+        with QSignalBlocker(spinbox):
+            spinbox.setValue(value)
+        self.on_property_changed(name, value)
     
-    def create_selection_properties(self):
-        """Create selection tool properties"""
-        # Clear existing properties
-        while self.tool_layout.rowCount() > 0:
-            self.tool_layout.removeRow(0)
-        
-        # Feather slider
-        self.feather_slider = QSlider(Qt.Horizontal)
-        self.feather_slider.setRange(0, 50)
-        self.feather_slider.setValue(0)
-        self.feather_slider.valueChanged.connect(lambda v: self.on_property_changed('feather', v))
-        
-        self.feather_spinbox = QSpinBox()
-        self.feather_spinbox.setRange(0, 50)
-        self.feather_spinbox.setValue(0)
-        self.feather_spinbox.valueChanged.connect(lambda v: self.on_property_changed('feather', v))
-        
-        feather_layout = QHBoxLayout()
-        feather_layout.addWidget(self.feather_slider)
-        feather_layout.addWidget(self.feather_spinbox)
-        
-        self.tool_layout.addRow("Feather:", feather_layout)
-        
-        # Mode combo box
-        self.mode_combo = QComboBox()
-        self.mode_combo.addItems(["Replace", "Add", "Subtract", "Intersect"])
-        self.mode_combo.currentTextChanged.connect(lambda v: self.on_property_changed('mode', v.lower()))
-        
-        self.tool_layout.addRow("Mode:", self.mode_combo)
+    def _on_spinbox_changed(self, slider: QSlider, name: str, scale: int, value):
+        """Copy a spinbox edit into its slider and apply it to the tool"""
+        with QSignalBlocker(slider):
+            slider.setValue(int(round(value * scale)))
+        self.on_property_changed(name, value)
+    
+    def _on_choice_changed(self, name: str, text: str):
+        """Apply an option picked in a choice row's combo box"""
+        self.on_property_changed(name, text.lower())
     
     def set_tool(self, tool):
         """Set the current tool and update properties"""
@@ -273,77 +147,40 @@ class PropertiesPanel(QWidget):
         if tool is None:
             return
         
-        tool_name = tool.name.lower()
-        
-        # Update properties based on tool type
-        if "brush" in tool_name:
-            self.create_brush_properties()
-        elif "eraser" in tool_name:
-            self.create_eraser_properties()
-        elif "smudge" in tool_name:
-            self.create_smudge_properties()
-        elif "selection" in tool_name:
-            self.create_selection_properties()
+        # Show the pre-built page for this tool type
+        page = self._pages.get(tool.KIND)
+        if page is not None:
+            self.stack.setCurrentWidget(page)
         
         # Update property values
         self.update_property_values()
     
     def update_property_values(self):
         """Update property values from current tool"""
-        if not self.current_tool:
+        tool = self.current_tool
+        if not tool:
             return
         
-        # Update size
-        if hasattr(self, 'size_slider'):
-            size = self.current_tool.get_property('size', 10)
-            self.size_slider.setValue(int(size))
-            if hasattr(self, 'size_spinbox'):
-                self.size_spinbox.setValue(int(size))
-        
-        # Update opacity
-        if hasattr(self, 'opacity_slider'):
-            opacity = self.current_tool.get_property('opacity', 1.0)
-            self.opacity_slider.setValue(int(opacity * 100))
-            if hasattr(self, 'opacity_spinbox'):
-                self.opacity_spinbox.setValue(opacity)
-        
-        # Update hardness
-        if hasattr(self, 'hardness_slider'):
-            hardness = self.current_tool.get_property('hardness', 0.5)
-            self.hardness_slider.setValue(int(hardness * 100))
-            if hasattr(self, 'hardness_spinbox'):
-                self.hardness_spinbox.setValue(hardness)
-        
-        # Update spacing
-        if hasattr(self, 'spacing_slider'):
-            spacing = self.current_tool.get_property('spacing', 0.25)
-            self.spacing_slider.setValue(int(spacing * 100))
-            if hasattr(self, 'spacing_spinbox'):
-                self.spacing_spinbox.setValue(spacing)
-        
-        # Update strength
-        if hasattr(self, 'strength_slider'):
-            strength = self.current_tool.get_property('strength', 0.5)
-            self.strength_slider.setValue(int(strength * 100))
-            if hasattr(self, 'strength_spinbox'):
-                self.strength_spinbox.setValue(strength)
+        page = self.stack.currentWidget()
         
-        # Update feather
-        if hasattr(self, 'feather_slider'):
-            feather = self.current_tool.get_property('feather', 0)
-            self.feather_slider.setValue(feather)
-            if hasattr(self, 'feather_spinbox'):
-                self.feather_spinbox.setValue(feather)
+        # Update each slider/spinbox pair the page has
+        for name, slider, spinbox, scale, default in page.pairs:
+            value = tool.get_property(name, default)
+            # Values come from the tool, so don't echo them back as property changes
+            with QSignalBlocker(slider), QSignalBlocker(spinbox):
+                slider.setValue(int(round(value * scale)))
+                spinbox.setValue(int(round(value)) if scale == 1 else value)
         
-        # Update mode
-        if hasattr(self, 'mode_combo'):
-            mode = self.current_tool.get_property('mode', 'replace')
-            index = self.mode_combo.findText(mode.capitalize())
+        # Update each choice row, defaulting to its first option
+        for name, combo in page.choices:
+            value = tool.get_property(name, combo.itemText(0).lower())
+            index = combo.findText(value.capitalize())
             if index >= 0:
-                self.mode_combo.setCurrentIndex(index)
+                with QSignalBlocker(combo):
+                    combo.setCurrentIndex(index)
     
     def on_property_changed(self, name: str, value):
         """Handle property change"""
         if self.current_tool:
             self.current_tool.set_property(name, value)
-            self.property_changed.emit(name, value) 
\ No newline at end of file
+            self.property_changed[str, type(value)].emit(name, value) 
\ No newline at end of file
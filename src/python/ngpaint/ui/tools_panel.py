@@ -2,80 +2,187 @@
 Tools panel for selecting drawing tools
 """
 
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QButtonGroup
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QIcon, QPixmap
+from pathlib import Path
+from typing import TYPE_CHECKING, Final
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QButtonGroup, QSizePolicy
+from PySide6.QtCore import Qt, Signal, QSize, QSignalBlocker, QTimer
+from PySide6.QtGui import QIcon, QPixmap, QPixmapCache, QPainter, QFont
+
+# Only needed for the annotation; importing the panel shouldn't pull in core.tools
+if TYPE_CHECKING:
+    from ..core.tools import ToolManager
+
+_ICON_SIZE = QSize(24, 24)
+_ICON_DIR = Path(__file__).parent / "icons"
+
+
+def _tool_icon(tool_name: str, glyph: str) -> QIcon:
+    """Return the tool's SVG icon, or its glyph rendered into QPixmapCache if it has none"""
+    # QIcon's SVG engine rasterizes once per (size, mode, state) and caches it
+    svg = _ICON_DIR / f"{tool_name}.svg"
+    if svg.is_file():
+        return QIcon(str(svg))
+    
+    # QPixmap needs a QGuiApplication, so glyphs are rasterized on first use, not at import
+    key = f"tool:{tool_name}"
+    pixmap = QPixmapCache.find(key)
+    if pixmap is None:
+        pixmap = QPixmap(_ICON_SIZE * 2)  # 2x so the glyph stays sharp on HiDPI screens
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        font = QFont()
+        font.setPixelSize(pixmap.height() * 3 // 4)
+        painter.setFont(font)
+        painter.drawText(pixmap.rect(), Qt.AlignCenter, glyph)
+        painter.end()
+        QPixmapCache.insert(key, pixmap)
+    return QIcon(pixmap)
 
-from ..core.tools import ToolManager
 
 class ToolsPanel(QWidget):
     """Panel for selecting drawing tools"""
     
-    def __init__(self, tool_manager: ToolManager):
+    # (tool name, glyph, tooltip) in button order
+    TOOLS = (
+        ("brush", "🖌️", "Brush Tool (B)"),
+        ("eraser", "🧽", "Eraser Tool (E)"),
+        ("smudge", "👆", "Smudge Tool (S)"),
+        ("selection", "⬜", "Selection Tool (M)"),
+    )
+    DEFAULT_TOOL = "brush"
+    
+    BUTTON_SIZE = 50
+    MARGIN = 5
+    SPACING = 2
+    
+    # Built once at class creation and shared by every panel instance
+    BUTTON_STYLE: Final[str] = """
+        QPushButton {
+            border: 1px solid #ccc;
+            border-radius: 5px;
+            background-color: #f0f0f0;
+        }
+        QPushButton:hover {
+            background-color: #e0e0e0;
+        }
+        QPushButton:checked {
+            background-color: #0078d4;
+            color: white;
+            border-color: #005a9e;
+        }
+    """
+    
+    def __init__(self, tool_manager: "ToolManager"):
         super().__init__()
         self.tool_manager = tool_manager
-        self.button_group = QButtonGroup()
         
-        self.setup_ui()
-        self.setup_connections()
+        # Buttons, group and connections are built on first show
+        self._initialized = False
         
         # Set panel properties
         self.setMaximumWidth(60)
         self.setMinimumWidth(60)
+        self.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Expanding)
+        
+        # The contents are a column of fixed-size buttons, so the hint is known up front
+        n = len(self.TOOLS)
+        self._size_hint = QSize(60, 2 * self.MARGIN + n * self.BUTTON_SIZE + (n - 1) * self.SPACING)
+    
+    def sizeHint(self) -> QSize:
+        """Return the precomputed size instead of walking the child layout"""
+        return self._size_hint
+    
+    def minimumSizeHint(self) -> QSize:
+        """The buttons can't shrink, so the minimum is the full hint"""
+        return self._size_hint
+    
+    def showEvent(self, event):
+        """Build the panel contents the first time it becomes visible"""
+        self._ensure_initialized()
+        super().showEvent(event)
+    
+    def _ensure_initialized(self):
+        """Create the tool buttons and connect them, once"""
+        if self._initialized:
+            return
+        self._initialized = True
+        self.button_group = QButtonGroup(self)
+        self._buttons = []  # Kept Python-side so iteration never calls button_group.buttons()
+        self._id_to_tool = []  # Group id -> tool name; idClicked passes a plain int
+        
+        # Bursts of clicks collapse into one set_tool for the last choice
+        self._pending_tool = None
+        self._tool_timer = QTimer(self)
+        self._tool_timer.setSingleShot(True)
+        self._tool_timer.setInterval(0)
+        self._tool_timer.timeout.connect(self._apply_pending_tool)
+        
+        self.setup_ui()
+        self.setup_connections()
     
     def setup_ui(self):
         """Setup the UI layout"""
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(5, 5, 5, 5)
-        layout.setSpacing(2)
+        layout = self._layout = QVBoxLayout(self)
+        layout.setContentsMargins(self.MARGIN, self.MARGIN, self.MARGIN, self.MARGIN)
+        layout.setSpacing(self.SPACING)
         
-        # Create tool buttons
-        self.create_tool_button("brush", "🖌️", "Brush Tool (B)")
-        self.create_tool_button("eraser", "🧽", "Eraser Tool (E)")
-        self.create_tool_button("smudge", "👆", "Smudge Tool (S)")
-        self.create_tool_button("selection", "⬜", "Selection Tool (M)")
+        # One stylesheet on the panel covers every tool button
+        self.setStyleSheet(self.BUTTON_STYLE)
+        
+        # Hold layout activation and repaints so all insertions settle in one pass
+        self.setUpdatesEnabled(False)
+        layout.setEnabled(False)
+        
+        # Create every tool button first, then insert them in one burst
+        for row in self.TOOLS:
+            self.create_tool_button(*row)
+        for button in self._buttons:
+            layout.addWidget(button)
+        
+        # The tool set is fixed once built, so freeze the lookups into tuples
+        self._buttons = tuple(self._buttons)
+        self._id_to_tool = tuple(self._id_to_tool)
         
         # Add stretch to push buttons to top
-        layout.addStretch()
+        layout.addStretch(1)
+        
+        layout.setEnabled(True)
+        self.setUpdatesEnabled(True)
     
-    def create_tool_button(self, tool_name: str, icon_text: str, tooltip: str):
-        """Create a tool button"""
-        button = QPushButton(icon_text)
+    def create_tool_button(self, tool_name: str, icon_text: str, tooltip: str) -> QPushButton:
+        """Create a tool button; the caller adds it to the layout"""
+        button = QPushButton()
+        button.setIcon(_tool_icon(tool_name, icon_text))
+        button.setIconSize(_ICON_SIZE)
         button.setToolTip(tooltip)
         button.setCheckable(True)
-        button.setFixedSize(50, 50)
-        button.setProperty("tool_name", tool_name)
-        
-        # Style the button
-        button.setStyleSheet("""
-            QPushButton {
-                border: 1px solid #ccc;
-                border-radius: 5px;
-                background-color: #f0f0f0;
-                font-size: 16px;
-            }
-            QPushButton:hover {
-                background-color: #e0e0e0;
-            }
-            QPushButton:checked {
-                background-color: #0078d4;
-                color: white;
-                border-color: #005a9e;
-            }
-        """)
+        button.setFixedSize(self.BUTTON_SIZE, self.BUTTON_SIZE)
         
-        self.button_group.addButton(button)
-        self.layout().addWidget(button)
+        self.button_group.addButton(button, len(self._id_to_tool))
+        self._buttons.append(button)
+        self._id_to_tool.append(tool_name)
         
-        # Set brush as default
-        if tool_name == "brush":
-            button.setChecked(True)
+        # The initial check is state, not a selection; keep it off the group's signals
+        if tool_name == self.DEFAULT_TOOL:
+            with QSignalBlocker(self.button_group):
+                button.setChecked(True)
+        return button
     
     def setup_connections(self):
         """Setup signal connections"""
-        self.button_group.buttonClicked.connect(self.on_tool_selected)
+        # One group-level int signal serves every button; per-button slots, if
+        # ever needed, should be partial-bound methods as in PropertiesPanel
+        self.button_group.idClicked.connect(self.on_tool_selected)
+    
+    def on_tool_selected(self, button_id: int):
+        """Handle tool selection; the switch is applied on the next event-loop pass"""
+        self._pending_tool = self._id_to_tool[button_id]
+        if not self._tool_timer.isActive():
+            self._tool_timer.start()
     
-    def on_tool_selected(self, button):
-        """Handle tool selection"""
-        tool_name = button.property("tool_name")
-        self.tool_manager.set_tool(tool_name) 
\ No newline at end of file
+    def _apply_pending_tool(self):
+        """Switch to the most recently selected tool"""
+        tool_name, self._pending_tool = self._pending_tool, None
+        if tool_name is not None:
+            self.tool_manager.set_tool(tool_name) 
\ No newline at end of file
@@ -0,0 +1,8 @@
+"""
+Pytest configuration: make the in-tree ngpaint package importable
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "python"))
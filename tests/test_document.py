@@ -0,0 +1,43 @@
+"""
+Tests for the numpy fallback Document
+"""
+
+from ngpaint.core.document import Document
+
+
+def test_undo_after_deleting_lower_layer_keeps_active_index_valid():
+    """Undo resolves the active layer by id, not by the index stored in the snapshot"""
+    document = Document()
+    document.new_document(200, 200)
+    document.add_layer("A")
+    document.add_layer("B")
+    document.draw_brush_stroke([(10, 10), (50, 50)], 5, 1.0, (255, 0, 0, 255))
+    
+    # Delete A, which shifts B down from slot 2 to slot 1
+    document.set_active_layer(1)
+    assert document.delete_active_layer()
+    assert document.undo()
+    
+    assert document.get_layer_count() == 2
+    assert document.get_active_layer_index() == 1
+    
+    # Strokes must still land on a real layer after the undo
+    before = document.get_composited_image().copy()
+    document.draw_brush_stroke([(100, 100), (150, 150)], 5, 1.0, (0, 0, 255, 255))
+    assert not (document.get_composited_image() == before).all()
+
+
+def test_unsupported_filter_keeps_composite_cached():
+    """Filters the fallback doesn't implement don't force a full recomposite"""
+    document = Document()
+    document.new_document(200, 200)
+    document.get_composited_image()
+    version = document.composite_version
+    
+    document.apply_filter("smudge", {})
+    document.get_composited_image()
+    assert document.composite_version == version
+    
+    document.apply_filter("gaussian_blur", {"radius": 2})
+    document.get_composited_image()
+    assert document.composite_version == version + 1
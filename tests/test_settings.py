@@ -0,0 +1,13 @@
+"""
+Tests for Settings persistence
+"""
+
+from ngpaint.core.settings import Settings
+
+
+def test_save_reports_unserialisable_settings_instead_of_raising(tmp_path, capsys):
+    """A value the JSON encoder rejects is reported, not raised out of save()"""
+    settings = Settings(str(tmp_path / "settings.json"))
+    settings.set("ui.recent", {(1, 2): "tuple keys are not JSON"})
+    settings.save()
+    assert "Could not save settings" in capsys.readouterr().out
@@ -0,0 +1,50 @@
+"""
+Tests for stroke point buffering in the drawing tools
+"""
+
+from PySide6.QtCore import QPoint
+
+from ngpaint.core.document import Document
+from ngpaint.core.tools import BrushTool
+
+
+def _brush_on_blank_layer():
+    document = Document()
+    document.new_document(200, 100)
+    document.add_layer("Ink")
+    brush = BrushTool()
+    brush.set_document(document)
+    brush.size = 10.0
+    brush.hardness = 1.0
+    return document, brush
+
+
+def test_release_sample_is_drawn():
+    """The stroke reaches the release position even without intermediate moves"""
+    document, brush = _brush_on_blank_layer()
+    brush.mouse_press(QPoint(10, 50))
+    brush.mouse_release(QPoint(150, 50))
+    assert document.get_composited_image()[50, 150, 3] == 255
+    assert tuple(document.get_composited_image()[50, 150, :3]) == brush.color[:3]
+
+
+def test_spacing_skip_is_capped_and_duplicates_dropped():
+    """Large brushes skip only samples within MAX_POINT_SPACING of the last kept point"""
+    _, brush = _brush_on_blank_layer()
+    brush.size = 100.0
+    brush.mouse_press(QPoint(10, 10))
+    for x, y in ((12, 11), (12, 11), (14, 13), (17, 14)):
+        brush.mouse_move(QPoint(x, y))
+    assert brush.stroke_points.tolist() == [[10, 10], [12, 11], [14, 13], [17, 14]]
+    brush.mouse_move(QPoint(18, 15))
+    assert brush.stroke_points.tolist()[-1] == [17, 14]
+
+
+def test_release_point_bypasses_spacing():
+    """The release sample is drawn even when it is closer than the brush spacing"""
+    document, brush = _brush_on_blank_layer()
+    brush.mouse_press(QPoint(10, 50))
+    brush.mouse_move(QPoint(150, 50))
+    brush.mouse_release(QPoint(152, 50))
+    ink = document.layers[document.get_active_layer_index()].image
+    assert ink[50, 156, 3] == 255